@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.contenttypes.admin import GenericTabularInline
 
-from common.models import Language, LanguageProficiency, Report, Skill, Specialization
+from common.models import Language, LanguageProficiency, NotificationOutbox, Report, Skill, Specialization
 
 
 class LanguageProficiencyInline(GenericTabularInline):
@@ -34,3 +34,9 @@ class ReportAdmin(admin.ModelAdmin):
     list_display = ('id', 'reporter', 'content_object', 'created_at', 'is_resolved')
     list_filter = ('is_resolved', 'created_at')
     search_fields = ('reporter__username', 'message')
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'chat_id', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status',)
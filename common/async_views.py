@@ -0,0 +1,31 @@
+from functools import wraps
+
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from users.auth import AsyncTelegramTokenAuthentication
+
+authenticator = AsyncTelegramTokenAuthentication()
+
+
+def async_api_view(view_func):
+    """
+    Декоратор для async-обработчиков под ASGI.
+    Аутентифицирует запрос через AsyncTelegramTokenAuthentication и кладет пользователя в request.user.
+    """
+
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user_auth = await authenticator.aauthenticate(request)
+        except AuthenticationFailed as exc:
+            return JsonResponse({'detail': str(exc.detail)}, status=exc.status_code)
+
+        if user_auth is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+        request.user = user_auth[0]
+        return await view_func(request, *args, **kwargs)
+
+    return wrapper
+
@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from common.models import NotificationOutbox
+from common.notifications import NotificationDispatcher
+
+
+class StubTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.delay)
+        body = json.dumps({'ok': True, 'result': {}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = ('Замеряет пропускную способность диспетчера уведомлений на локальной заглушке Telegram '
+            '(сообщения создаются в транзакции, которая затем откатывается)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=1000)
+        parser.add_argument('--chats', type=int, default=1000)
+        parser.add_argument('--global-rate', type=float, default=10_000)
+        parser.add_argument('--latency', type=float, default=0.005, help='Задержка ответа заглушки, с')
+
+    def handle(self, *args, messages, chats, global_rate, latency, **options):
+        StubTelegramHandler.delay = latency
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubTelegramHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        try:
+            with transaction.atomic():
+                NotificationOutbox.objects.bulk_create([
+                    NotificationOutbox(chat_id=str(i % chats), text=f'Benchmark {i}') for i in range(messages)
+                ])
+
+                with httpx.Client(base_url=f'http://127.0.0.1:{server.server_port}') as client:
+                    dispatcher = NotificationDispatcher(client, global_rate=global_rate, chat_interval=0)
+                    started = time.perf_counter()
+                    sent = dispatcher.dispatch()
+                    elapsed = time.perf_counter() - started
+
+                transaction.set_rollback(True)
+        finally:
+            server.shutdown()
+
+        self.stdout.write(f'{sent} messages in {elapsed:.2f} s ({sent / elapsed:.0f}/s)')
@@ -0,0 +1,12 @@
+class EagerLoadingMixin:
+    """
+    Применяет к queryset план предзагрузки сериализатора текущего action
+    (staticmethod setup_eager_loading(queryset) у класса сериализатора).
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
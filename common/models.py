@@ -1,8 +1,11 @@
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from common.tracking import ChangeTrackingMixin
+
 
 class Specialization(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -53,7 +56,9 @@ class LanguageProficiency(models.Model):
         return f'{self.content_object} - {self.language} ({self.level})'
 
 
-class Report(models.Model):
+class Report(ChangeTrackingMixin, models.Model):
+    tracked_fields = ('is_resolved',)
+
     reporter = models.ForeignKey(
         'users.User',
         on_delete=models.CASCADE,
@@ -82,3 +87,42 @@ class Report(models.Model):
 
     def __str__(self):
         return f"Жалоба от {self.reporter} на {self.content_object}"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Исходящее сообщение Telegram. Пишется в той же транзакции, что и изменение,
+    о котором уведомляет, и отправляется диспетчером (common.notifications).
+    Сообщения одному получателю за окно дайджеста объединяются в одно (status='merged').
+    Во время отправки сообщение находится в статусе sending: next_attempt_at — срок,
+    после которого оно считается брошенным и отправляется повторно.
+    """
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('sending', _('Sending')),
+        ('sent', _('Sent')),
+        ('failed', _('Failed')),
+        ('merged', _('Merged')),
+    ]
+
+    chat_id = models.CharField(max_length=64)
+    text = models.TextField()
+    reply_markup = models.JSONField(null=True, blank=True)
+    # Язык, активный при создании сообщения: на нем формируется заголовок дайджеста
+    language = models.CharField(max_length=8, blank=True)
+    # Сообщение уже собрано в дайджест и больше не объединяется (иначе заголовки вложатся друг в друга)
+    is_digest = models.BooleanField(default=False)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at', 'id'], name='notification_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.chat_id}: {self.status}"
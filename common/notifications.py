@@ -0,0 +1,266 @@
+import json
+import math
+import time
+import uuid
+from datetime import timedelta
+from os import environ
+
+import httpx
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone, translation
+from django.utils.translation import gettext as _
+
+from common.models import NotificationOutbox
+from common.redis import redis_client
+
+DISPATCH_LOCK_KEY = 'notifications:dispatch_lock'
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def enqueue_notification(chat_id, text, reply_markup=None):
+    """
+    Добавляет сообщение в outbox в текущей транзакции. Отправка откладывается на
+    NOTIFICATIONS_DIGEST_WINDOW: когда первое сообщение получателю становится готовым к отправке,
+    диспетчер присоединяет к нему все ожидающие сообщения этого получателя (make_digest).
+    """
+    from common.tasks import dispatch_notifications
+
+    window = settings.NOTIFICATIONS_DIGEST_WINDOW
+    notification = NotificationOutbox.objects.create(
+        chat_id=str(chat_id),
+        text=text,
+        reply_markup=reply_markup,
+        language=translation.get_language() or settings.LANGUAGE_CODE,
+        next_attempt_at=timezone.now() + timedelta(seconds=window),
+    )
+    transaction.on_commit(lambda: dispatch_notifications.apply_async(countdown=window))
+    return notification
+
+
+def make_digest(notifications, waiting=()):
+    """
+    Объединяет новые сообщения одному получателю (по порядку id) в первое из них.
+    Остальные помечаются merged; не поместившиеся в лимит Telegram остаются в очереди.
+    Повторные попытки и уже собранные дайджесты отправляются как есть.
+    Возвращает сообщения, которые нужно отправить сейчас.
+
+    :param notifications: готовые к отправке сообщения
+    :param waiting: еще не готовые сообщения тех же получателей, их можно только присоединить
+    """
+    result = []
+    by_chat = {}
+    for notification in notifications:
+        if notification.attempts or notification.is_digest:
+            result.append(notification)
+        else:
+            by_chat.setdefault(notification.chat_id, []).append(notification)
+    for notification in waiting:
+        if notification.chat_id in by_chat:
+            by_chat[notification.chat_id].append(notification)
+
+    for primary, *rest in by_chat.values():
+        rest.sort(key=lambda n: n.id)
+        result.append(primary)
+        merged = [primary]
+        length = len(primary.text)
+        for notification in rest:
+            length += len(notification.text) + 2
+            # Запас под заголовок дайджеста
+            if length > TELEGRAM_MESSAGE_LIMIT - 100:
+                break
+            merged.append(notification)
+        if len(merged) == 1:
+            continue
+
+        with translation.override(primary.language or settings.LANGUAGE_CODE):
+            header = _('New notifications: %(count)s') % {'count': len(merged)}
+        primary.text = '\n\n'.join([header, *(n.text for n in merged)])
+        primary.is_digest = True
+        markups = {json.dumps(n.reply_markup, sort_keys=True) for n in merged}
+        if len(markups) > 1:
+            primary.reply_markup = None
+        for notification in merged[1:]:
+            notification.status = 'merged'
+    return result
+
+
+def make_client(**kwargs):
+    return httpx.Client(
+        base_url=settings.TELEGRAM_API_URL,
+        timeout=settings.NOTIFICATIONS_HTTP_TIMEOUT,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        **kwargs
+    )
+
+
+class NotificationDispatcher:
+    """
+    Отправляет сообщения из outbox через один keep-alive HTTP-клиент.
+
+    Соблюдает лимиты Telegram: не больше global_rate сообщений в секунду всего и
+    не чаще одного сообщения в chat_interval секунд в один чат. Сообщение в чат, лимит которого
+    еще не истек, откладывается без траты попытки. Ошибки сети и 5xx повторяются
+    с экспоненциальной задержкой, 429 — через retry_after, остальные 4xx не повторяются.
+
+    Лимиты считаются в памяти процесса, поэтому одновременно работает один диспетчер (блокировка в Redis).
+    """
+
+    def __init__(self, client=None, global_rate=None, chat_interval=None, batch_size=None):
+        self.client = client or make_client()
+        self.global_interval = 1 / (global_rate or settings.NOTIFICATIONS_GLOBAL_RATE)
+        self.chat_interval = chat_interval if chat_interval is not None else settings.NOTIFICATIONS_CHAT_INTERVAL
+        self.batch_size = batch_size or settings.NOTIFICATIONS_BATCH_SIZE
+        self._next_send = 0
+        self._chat_next_send = {}
+        # Наименьшая задержка (в секундах) среди отложенных сообщений: через нее нужен повторный запуск
+        self.next_run_in = None
+
+    def dispatch(self, max_seconds=None):
+        """
+        Отправляет готовые к отправке сообщения пачками, пока они есть (или max_seconds).
+        Возвращает количество отправленных.
+        """
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        sent = 0
+        while deadline is None or time.monotonic() < deadline:
+            claimed = self.claim()
+            if claimed is None:
+                break
+            # HTTP-запросы и ожидание лимитов — вне транзакции: строки не заблокированы
+            for notification in claimed:
+                sent += self.process(notification)
+            NotificationOutbox.objects.bulk_update(
+                claimed, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+            )
+        return sent
+
+    def claim(self):
+        """
+        В короткой транзакции выбирает пачку готовых сообщений, собирает дайджесты и помечает
+        отправляемые статусом sending. Возвращает их (в памяти снова pending, результат отправки
+        записывает dispatch) или None, если готовых сообщений нет.
+        Сообщения, брошенные в sending упавшим процессом, берутся повторно по истечении
+        NOTIFICATIONS_SENDING_TIMEOUT (возможна повторная доставка).
+        """
+        fields = ['text', 'reply_markup', 'is_digest', 'status', 'next_attempt_at']
+        with transaction.atomic():
+            now = timezone.now()
+            batch = list(
+                NotificationOutbox.objects.select_for_update(skip_locked=True)
+                .filter(status__in=('pending', 'sending'), next_attempt_at__lte=now)
+                .order_by('id')[:self.batch_size]
+            )
+            if not batch:
+                return None
+            # Более поздние сообщения тем же получателям присоединяются к дайджесту досрочно
+            waiting = list(
+                NotificationOutbox.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', attempts=0, is_digest=False, next_attempt_at__gt=now,
+                        chat_id__in={notification.chat_id for notification in batch})
+                .order_by('id')
+            )
+            claimed = make_digest(batch, waiting)
+            for notification in claimed:
+                notification.status = 'sending'
+                notification.next_attempt_at = now + timedelta(seconds=settings.NOTIFICATIONS_SENDING_TIMEOUT)
+            NotificationOutbox.objects.bulk_update(
+                batch + [notification for notification in waiting if notification.status == 'merged'], fields
+            )
+
+        for notification in claimed:
+            notification.status = 'pending'
+        return claimed
+
+    def process(self, notification):
+        chat_wait = self._chat_next_send.get(notification.chat_id, 0) - time.monotonic()
+        if chat_wait > 0:
+            self.postpone(notification, chat_wait)
+            return 0
+
+        self.wait_global_slot()
+        self._chat_next_send[notification.chat_id] = time.monotonic() + self.chat_interval
+        notification.attempts += 1
+        try:
+            response = self.send(notification)
+        except httpx.HTTPError as e:
+            self.retry(notification, repr(e))
+            return 0
+
+        if response.status_code == 200:
+            notification.status = 'sent'
+            notification.sent_at = timezone.now()
+            notification.last_error = ''
+            return 1
+
+        if response.status_code == 429:
+            try:
+                retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+            except ValueError:
+                # Тело не JSON (например, ответ прокси): исключение откатило бы всю пачку
+                retry_after = 1
+            self.postpone(notification, retry_after)
+            notification.last_error = response.text
+        elif response.status_code >= 500:
+            self.retry(notification, response.text)
+        else:
+            notification.status = 'failed'
+            notification.last_error = response.text
+        return 0
+
+    def postpone(self, notification, delay):
+        notification.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        self.next_run_in = delay if self.next_run_in is None else min(self.next_run_in, delay)
+
+    def send(self, notification):
+        data = {"chat_id": notification.chat_id, "text": notification.text}
+        if notification.reply_markup:
+            data["reply_markup"] = json.dumps(notification.reply_markup)
+        return self.client.post(f"/bot{environ.get('BOT_TOKEN')}/sendMessage", data=data)
+
+    def wait_global_slot(self):
+        delay = self._next_send - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_send = max(self._next_send, time.monotonic()) + self.global_interval
+
+    @staticmethod
+    def retry(notification, error):
+        notification.last_error = error
+        if notification.attempts >= settings.NOTIFICATIONS_MAX_ATTEMPTS:
+            notification.status = 'failed'
+            return
+        delay = min(settings.NOTIFICATIONS_RETRY_BASE * 2 ** (notification.attempts - 1),
+                    settings.NOTIFICATIONS_RETRY_MAX)
+        notification.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+
+
+def run_dispatcher():
+    """
+    Запускает диспетчер, если он не запущен в другом процессе. Возвращает количество отправленных.
+    Если сообщения были отложены лимитами, ставит следующий запуск через наименьшую задержку,
+    не дожидаясь ежеминутного запуска по расписанию.
+    """
+    from common.tasks import dispatch_notifications
+
+    token = uuid.uuid4().hex
+    if not redis_client.set(DISPATCH_LOCK_KEY, token, nx=True, ex=settings.NOTIFICATIONS_LOCK_TIMEOUT):
+        return 0
+    try:
+        with make_client() as client:
+            dispatcher = NotificationDispatcher(client)
+            # Останавливаемся с запасом, чтобы блокировка не истекла во время отправки
+            sent = dispatcher.dispatch(max_seconds=settings.NOTIFICATIONS_LOCK_TIMEOUT / 2)
+    finally:
+        redis_client.eval(RELEASE_LOCK_SCRIPT, 1, DISPATCH_LOCK_KEY, token)
+
+    if dispatcher.next_run_in is not None:
+        dispatch_notifications.apply_async(countdown=math.ceil(dispatcher.next_run_in))
+    return sent
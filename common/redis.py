@@ -0,0 +1,8 @@
+import redis
+import redis.asyncio
+from django.conf import settings
+
+redis_client = redis.StrictRedis.from_url(settings.REDIS_URL)
+
+# Клиент для асинхронных обработчиков (ASGI); соединения привязаны к event loop воркера
+async_redis_client = redis.asyncio.StrictRedis.from_url(settings.REDIS_URL)
@@ -0,0 +1,9 @@
+from core.celery import celery_app as app
+
+
+@app.task
+def dispatch_notifications():
+    """Отправляем сообщения из outbox в Telegram"""
+    from common.notifications import run_dispatcher
+
+    run_dispatcher()
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+import httpx
+from django.test import TestCase, override_settings
+from django.utils import translation
+
+from common.models import NotificationOutbox
+from common.notifications import NotificationDispatcher, enqueue_notification
+
+
+class NotificationDispatcherTest(TestCase):
+    def make_dispatcher(self, handler, **kwargs):
+        client = httpx.Client(base_url='https://telegram.test', transport=httpx.MockTransport(handler))
+        return NotificationDispatcher(client, global_rate=1000, **kwargs)
+
+    def test_enqueue_is_transactional(self):
+        with patch('common.tasks.dispatch_notifications.apply_async') as apply_mock:
+            with self.captureOnCommitCallbacks(execute=True):
+                enqueue_notification(123, 'Статус отклика изменен')
+
+        self.assertEqual(NotificationOutbox.objects.get().chat_id, '123')
+        apply_mock.assert_called_once()
+
+    def test_sent_messages_are_marked(self):
+        NotificationOutbox.objects.create(chat_id='1', text='Hello')
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={'ok': True})
+
+        self.assertEqual(self.make_dispatcher(handler).dispatch(), 1)
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(NotificationOutbox.objects.get().status, 'sent')
+
+    def test_messages_are_sent_outside_claim_transaction(self):
+        notification = NotificationOutbox.objects.create(chat_id='1', text='Hello')
+        statuses = []
+
+        def handler(request):
+            statuses.append(NotificationOutbox.objects.get(pk=notification.pk).status)
+            return httpx.Response(200, json={'ok': True})
+
+        self.make_dispatcher(handler).dispatch()
+        self.assertEqual(statuses, ['sending'])
+        self.assertEqual(NotificationOutbox.objects.get().status, 'sent')
+
+    def test_abandoned_sending_messages_are_reclaimed(self):
+        abandoned = NotificationOutbox.objects.create(chat_id='1', text='Hello', status='sending')
+        NotificationOutbox.objects.create(chat_id='2', text='Hello', status='sending',
+                                          next_attempt_at=abandoned.next_attempt_at + timedelta(minutes=5))
+
+        sent = self.make_dispatcher(lambda request: httpx.Response(200, json={'ok': True})).dispatch()
+
+        self.assertEqual(sent, 1)
+        abandoned.refresh_from_db()
+        self.assertEqual(abandoned.status, 'sent')
+
+    def test_server_errors_are_retried_later(self):
+        notification = NotificationOutbox.objects.create(chat_id='1', text='Hello')
+
+        self.make_dispatcher(lambda request: httpx.Response(502)).dispatch()
+
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('pending', 1))
+        self.assertGreater(notification.next_attempt_at, notification.created_at)
+
+    def test_client_errors_are_not_retried(self):
+        NotificationOutbox.objects.create(chat_id='1', text='Hello')
+
+        self.make_dispatcher(lambda request: httpx.Response(403, json={'ok': False})).dispatch()
+        self.assertEqual(NotificationOutbox.objects.get().status, 'failed')
+
+    def test_rate_limit_without_json_body_is_postponed(self):
+        notification = NotificationOutbox.objects.create(chat_id='1', text='Hello')
+
+        dispatcher = self.make_dispatcher(lambda request: httpx.Response(429, text='Too Many Requests'))
+        dispatcher.dispatch()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(dispatcher.next_run_in, 1)
+
+    def test_chat_rate_limit_postpones_messages(self):
+        NotificationOutbox.objects.create(chat_id='1', text='First')
+        NotificationOutbox.objects.create(chat_id='1', text='Second')
+
+        sent = self.make_dispatcher(
+            lambda request: httpx.Response(200, json={'ok': True}), chat_interval=60, batch_size=1
+        ).dispatch()
+
+        self.assertEqual(sent, 1)
+        self.assertEqual(NotificationOutbox.objects.filter(status='pending', attempts=0).count(), 1)
+
+    @override_settings(NOTIFICATIONS_DIGEST_WINDOW=0)
+    def test_messages_to_one_chat_are_digested(self):
+        with patch('common.tasks.dispatch_notifications.apply_async'), translation.override('en'):
+            enqueue_notification(1, 'First')
+            enqueue_notification(1, 'Second')
+        NotificationOutbox.objects.create(chat_id='2', text='Other')
+        requests = []
+
+        def handler(request):
+            requests.append(parse_qs(request.content.decode()))
+            return httpx.Response(200, json={'ok': True})
+
+        self.assertEqual(self.make_dispatcher(handler).dispatch(), 2)
+        self.assertEqual(requests[0]['text'], ['New notifications: 2\n\nFirst\n\nSecond'])
+        self.assertEqual(
+            sorted(NotificationOutbox.objects.values_list('status', flat=True)), ['merged', 'sent', 'sent']
+        )
+
+    @override_settings(NOTIFICATIONS_DIGEST_WINDOW=60)
+    def test_later_messages_join_the_first_due_message(self):
+        with patch('common.tasks.dispatch_notifications.apply_async'), translation.override('en'):
+            first = enqueue_notification(1, 'First')
+            enqueue_notification(1, 'Second')
+        NotificationOutbox.objects.filter(id=first.id).update(next_attempt_at=first.created_at)
+        requests = []
+
+        def handler(request):
+            requests.append(parse_qs(request.content.decode()))
+            return httpx.Response(200, json={'ok': True})
+
+        self.assertEqual(self.make_dispatcher(handler).dispatch(), 1)
+        self.assertEqual(requests[0]['text'], ['New notifications: 2\n\nFirst\n\nSecond'])
+
+    def test_postponed_digest_is_not_merged_again(self):
+        NotificationOutbox.objects.create(chat_id='1', text='Digest', is_digest=True)
+        NotificationOutbox.objects.create(chat_id='1', text='Later')
+        requests = []
+
+        def handler(request):
+            requests.append(parse_qs(request.content.decode())['text'][0])
+            return httpx.Response(200, json={'ok': True})
+
+        self.assertEqual(self.make_dispatcher(handler, chat_interval=0).dispatch(), 2)
+        self.assertEqual(requests, ['Digest', 'Later'])
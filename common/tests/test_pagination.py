@@ -0,0 +1,51 @@
+from django.db.models import Value, FloatField
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from common.pagination import KeysetPagination
+from users.models import User
+from vacancies.models import Vacancy
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        for i in range(5):
+            Vacancy.objects.create(title=f'Vacancy {i}', creator=self.user)
+        self.queryset = Vacancy.objects.annotate(match_score=Value(1.0, output_field=FloatField()))
+
+    def paginate(self, params):
+        paginator = KeysetPagination()
+        request = Request(self.factory.get('/feed/', params))
+        page = paginator.paginate_queryset(self.queryset, request)
+        return paginator, page
+
+    def test_pages_do_not_overlap(self):
+        paginator, first_page = self.paginate({'page_size': 2})
+        next_link = paginator.get_next_link()
+        self.assertIsNotNone(next_link)
+
+        cursor = next_link.split('cursor=')[1]
+        paginator, second_page = self.paginate({'page_size': 2, 'cursor': cursor})
+
+        first_ids = [v.id for v in first_page]
+        second_ids = [v.id for v in second_page]
+        self.assertEqual(len(second_ids), 2)
+        self.assertFalse(set(first_ids) & set(second_ids))
+        self.assertGreater(min(first_ids), max(second_ids))
+
+    def test_page_does_not_count(self):
+        with self.assertNumQueries(1):
+            self.paginate({'page_size': 2})
+
+    def test_last_page_has_no_next_link(self):
+        paginator, page = self.paginate({'page_size': 10})
+        self.assertEqual(len(page), 5)
+        self.assertIsNone(paginator.get_next_link())
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self.paginate({'cursor': 'not-a-cursor'})
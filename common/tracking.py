@@ -0,0 +1,94 @@
+from django.db import transaction
+
+
+class ChangeTrackingMixin:
+    """
+    Отслеживание изменений полей модели без повторных запросов к БД.
+
+    Значения полей из tracked_fields запоминаются при загрузке объекта (from_db)
+    и после каждого save(). get_changes() сравнивает их с текущими значениями в памяти
+    (работает и в обработчиках post_save), а после save() сохраненные изменения
+    доступны в saved_changes: {поле: (старое значение, новое значение)}.
+
+    У новых объектов изменений нет: отслеживание начинается после первого сохранения.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_tracked_fields()
+        return instance
+
+    def snapshot_tracked_fields(self):
+        self._tracked_values = {}
+        for name in self.tracked_fields:
+            attname = self._meta.get_field(name).attname
+            # Отложенные (defer/only) поля не отслеживаются, чтобы не загружать их отдельным запросом
+            if attname in self.__dict__:
+                self._tracked_values[name] = self.__dict__[attname]
+
+    def is_tracked(self, name):
+        return name in getattr(self, '_tracked_values', {})
+
+    def get_changes(self):
+        tracked_values = getattr(self, '_tracked_values', {})
+        changes = {}
+        for name, old_value in tracked_values.items():
+            new_value = getattr(self, self._meta.get_field(name).attname)
+            if new_value != old_value:
+                changes[name] = (old_value, new_value)
+        return changes
+
+    def save(self, *args, **kwargs):
+        changes = self.get_changes()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            changes = {name: value for name, value in changes.items() if name in update_fields}
+
+        super().save(*args, **kwargs)
+        self.saved_changes = changes
+        self.snapshot_tracked_fields()
+
+
+class TrackedUpdateMixin:
+    """
+    Миксин для UpdateModelMixin: загружает объект с select_for_update, обновляет его в транзакции
+    и, если поле tracked_field изменилось (ChangeTrackingMixin у модели), вызывает on_change.
+    Переопределенный update, который вызывает get_object до super().update, должен сам открыть транзакцию.
+
+    По умолчанию on_change ставит уведомление notification_func(instance, custom_message)
+    в outbox той же транзакции (оно отправляется диспетчером после коммита).
+    Прочие побочные эффекты (кэши, задачи) следует регистрировать через transaction.on_commit.
+    """
+    tracked_field = None
+    notification_func = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('update', 'partial_update'):
+            # Строка блокируется до конца транзакции: параллельные обновления видят изменение по очереди
+            # и уведомление отправляет только одно из них
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
+
+    def get_object(self):
+        # Объект загружается один раз за запрос: проверки прав, выбор сериализатора и обновление
+        # работают с одним экземпляром и его снимком отслеживаемых полей.
+        # При обновлении вызывается внутри transaction.atomic() (см. update)
+        if not hasattr(self, '_tracked_object'):
+            self._tracked_object = super().get_object()
+        return self._tracked_object
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        instance = serializer.save()
+        changes = getattr(instance, 'saved_changes', {})
+        if self.tracked_field in changes:
+            self.on_change(instance, changes)
+
+    def on_change(self, instance, changes):
+        self.notification_func(instance, self.request.data.get('custom_message'))
@@ -9,7 +9,7 @@ from rest_framework.viewsets import GenericViewSet
 from common.models import Specialization, Skill, Report
 from common.serializers import SpecializationSerializer, SkillSerializer, ReportSerializer, ReportAdminSerializer, \
     LanguageSerializer
-from common.services import perform_update_and_notify
+from common.tracking import TrackedUpdateMixin
 from core.settings import LANGUAGES, CACHE_TTL
 from vacancies.services import send_report_closed_notification
 from django.utils.translation import gettext as _, activate
@@ -76,7 +76,8 @@ class ReportViewSet(mixins.CreateModelMixin,
         serializer.save(reporter=self.request.user)
 
 
-class ReportAdminViewSet(mixins.CreateModelMixin,
+class ReportAdminViewSet(TrackedUpdateMixin,
+                         mixins.CreateModelMixin,
                          mixins.RetrieveModelMixin,
                          mixins.UpdateModelMixin,
                          mixins.ListModelMixin,
@@ -91,24 +92,8 @@ class ReportAdminViewSet(mixins.CreateModelMixin,
     serializer_class = ReportAdminSerializer
     permission_classes = [IsAdminUser]
     filterset_fields = ['is_resolved']
-
-    def update(self, request, *args, **kwargs):
-        return perform_update_and_notify(
-            view=self,
-            request=request,
-            update_method=lambda: super(ReportAdminViewSet, self).update(request, *args, **kwargs),
-            field_name='is_resolved',
-            notification_func=send_report_closed_notification
-        )
-
-    def partial_update(self, request, *args, **kwargs):
-        return perform_update_and_notify(
-            view=self,
-            request=request,
-            update_method=lambda: super(ReportAdminViewSet, self).partial_update(request, *args, **kwargs),
-            field_name='is_resolved',
-            notification_func=send_report_closed_notification
-        )
+    tracked_field = 'is_resolved'
+    notification_func = staticmethod(send_report_closed_notification)
 
 
 class SetLanguageView(APIView):
@@ -21,4 +21,24 @@ celery_app.conf.beat_schedule = {
         'task': 'vacancies.tasks.flush_views_to_db',
         'schedule': crontab(minute='*/1'),
     },
+    'rollup-response-stats-every-minute': {
+        'task': 'vacancies.tasks.rollup_response_stats',
+        'schedule': crontab(minute='*/1'),
+    },
+    'rollup-view-stats-every-10-minutes': {
+        'task': 'views.tasks.rollup_view_stats',
+        'schedule': crontab(minute='*/10'),
+    },
+    'manage-view-partitions-daily': {
+        'task': 'views.tasks.manage_view_partitions',
+        'schedule': crontab(minute=30, hour=3),
+    },
+    'dispatch-notifications-every-minute': {
+        'task': 'common.tasks.dispatch_notifications',
+        'schedule': crontab(minute='*/1'),
+    },
+    'update-exchange-rates-hourly': {
+        'task': 'vacancies.tasks.update_exchange_rates',
+        'schedule': crontab(minute=0),
+    },
 }
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Apps
 
@@ -177,6 +178,69 @@ REST_FRAMEWORK = {
 AUTH_USER_MODEL = 'users.User'
 
 CELERY_BROKER_URL = environ.get('CELERY_BROKER_URL')
+
+REDIS_URL = environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+# Telegram auth
+# Максимальный возраст initData (по auth_date), в течение которого проверенный токен можно кэшировать
+TELEGRAM_INIT_DATA_MAX_AGE = 60 * 60 * 24
+AUTH_CACHE_TTL = 60 * 60
+AUTH_CACHE_LOCAL_TTL = 5
+AUTH_CACHE_LOCAL_SIZE = 10000
+# Как часто (в секундах) поля профиля из initData записываются в БД
+USER_PROFILE_REFRESH_INTERVAL = 60 * 10
+
+# Индекс вакансий в памяти процесса (vacancies.index)
+VACANCY_INDEX_REBUILD_INTERVAL = 60 * 10
+VACANCY_INDEX_MAX_CHANGES = 10000
+
+# Кэш страниц ленты (vacancies.cache)
+FEED_CACHE_TTL = 60 * 5
+FEED_CACHE_LOCK_TIMEOUT = 10
+FEED_CACHE_LOCK_WAIT = 3
+FEED_FACETS_CACHE_TTL = 60
+
+# Кэш деталей вакансии по version (vacancies.cache)
+VACANCY_DETAIL_CACHE_TTL = 60 * 60 * 24
+
+# Сколько лучших по ts_rank совпадений поиска переранжируется с учетом match_score (vacancies.search)
+SEARCH_CANDIDATES_LIMIT = 1000
+
+# Окно (в секундах), в течение которого повторные просмотры объекта пользователем не учитываются
+VIEW_DEDUP_WINDOW = 60 * 30
+
+# Секции таблицы просмотров (views.partitions): сколько месяцев создавать заранее и сколько хранить
+VIEWS_PARTITIONS_AHEAD = 2
+VIEWS_RETENTION_MONTHS = int(environ.get('VIEWS_RETENTION_MONTHS', 12))
+# False — устаревшие секции только отсоединяются (для выгрузки в архив), True — удаляются
+VIEWS_RETENTION_DROP = environ.get('VIEWS_RETENTION_DROP', 'False') == 'True'
+
+# Размер пачки при переносе просмотров из Redis в БД (flush_views_to_db)
+VIEWS_FLUSH_BATCH_SIZE = 5000
+# Сколько потребителей потока просмотров запускает flush_views_to_db и через сколько мс
+# неподтвержденные записи упавшего потребителя забираются другими
+VIEWS_STREAM_CONSUMERS = int(environ.get('VIEWS_STREAM_CONSUMERS', 2))
+VIEWS_STREAM_CLAIM_IDLE = 60 * 1000
+
+# Отправка уведомлений Telegram из outbox (common.notifications)
+TELEGRAM_API_URL = environ.get('TELEGRAM_API_URL', 'https://api.telegram.org')
+NOTIFICATIONS_HTTP_TIMEOUT = 10
+# Лимиты Telegram: сообщений в секунду всего и секунд между сообщениями в один чат
+NOTIFICATIONS_GLOBAL_RATE = 25
+NOTIFICATIONS_CHAT_INTERVAL = 1
+NOTIFICATIONS_BATCH_SIZE = 100
+NOTIFICATIONS_MAX_ATTEMPTS = 8
+NOTIFICATIONS_RETRY_BASE = 5
+NOTIFICATIONS_RETRY_MAX = 60 * 30
+NOTIFICATIONS_LOCK_TIMEOUT = 60 * 5
+# Через сколько секунд сообщение в статусе sending (процесс упал во время отправки) снова берется в работу
+NOTIFICATIONS_SENDING_TIMEOUT = 60 * 5
+# Окно (в секундах), за которое сообщения одному получателю объединяются в дайджест (0 — без задержки)
+NOTIFICATIONS_DIGEST_WINDOW = int(environ.get('NOTIFICATIONS_DIGEST_WINDOW', 60))
+
+# Источник курсов валют для update_exchange_rates (пусто — курсы ведутся только через админку)
+EXCHANGE_RATES_URL = environ.get('EXCHANGE_RATES_URL', '')
+
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 
@@ -19,8 +19,9 @@ from django.urls import path, include
 
 from common.urls import specialization_router, skill_router, report_router, report_admin_router, schema_view
 from common.views import SetLanguageView
-from users.urls import user_router, education_router, additional_education_router, experience_router, user_book_router
-from vacancies.urls import vacancy_router, vacancy_response_router, vacancy_admin_router
+from users.urls import user_router, education_router, additional_education_router, experience_router, user_book_router, \
+    user_async_urlpatterns
+from vacancies.urls import vacancy_router, vacancy_response_router, vacancy_admin_router, vacancy_async_urlpatterns
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -38,6 +39,10 @@ urlpatterns = [
     path('api/vacancies-admin/', include(vacancy_admin_router.urls), name='vacancies-admin'),
     path('api/reports-admin/', include(report_admin_router.urls), name='reports-admin'),
 
+    # async (ASGI)
+    path('api/async/users/', include(user_async_urlpatterns)),
+    path('api/async/vacancies/', include(vacancy_async_urlpatterns)),
+
     # loc
     path('api/set-language/', SetLanguageView.as_view(), name='set-language'),
 
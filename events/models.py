@@ -1,8 +1,12 @@
+import json
+
 from django.db import models
+from django.utils.timezone import now
 
 from common.models import Skill, Specialization, Location
 from users.models import User
-from views.models import View
+from vacancies.tasks import VIEWS_STREAM_KEY
+from views.counters import view_counter
 from django.utils.translation import gettext_lazy as _
 
 
@@ -41,14 +45,34 @@ class Event(models.Model):
     tg_chat = models.URLField(blank=True, null=True)
     tg_link = models.URLField(blank=True, null=True)
     participants = models.ManyToManyField(User, blank=True)
+    views_count = models.IntegerField(default=0)
 
     def __str__(self):
         return self.name
 
+    def make_view_data(self, user):
+        return json.dumps({
+            "user_id": user.id,
+            "content_type": "events.event",
+            "object_id": self.id,
+            "timestamp": now().isoformat()
+        })
+
+    def register_view(self, user):
+        """
+        Записываем просмотр в Redis и возвращаем (просмотры, уникальные зрители) за один запрос.
+        """
+        return view_counter.register(self, user, VIEWS_STREAM_KEY, self.make_view_data(user))
+
+    async def aregister_view(self, user):
+        return await view_counter.aregister(self, user, VIEWS_STREAM_KEY, self.make_view_data(user))
+
     def view_count(self):
-        from django.contrib.contenttypes.models import ContentType
-        content_type = ContentType.objects.get_for_model(Event)
-        return View.objects.filter(content_type=content_type, object_id=self.id).count()
+        """Получаем количество просмотров события из счетчика в Redis"""
+        return view_counter.get_counts(self)[0]
+
+    async def aview_count(self):
+        return (await view_counter.aget_counts(self))[0]
 
 
 class Speaker(models.Model):
@@ -1,3 +1,41 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import fakeredis
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 
-# Create your tests here.
+from events.models import Event
+from users.models import User
+from vacancies.tasks import VIEWS_STREAM_KEY, flush_view_counters, consume_view_stream
+from views.models import View
+
+
+class EventViewsTest(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeStrictRedis()
+        for target in ('views.counters.redis_client', 'vacancies.tasks.redis_client'):
+            patcher = patch(target, self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        self.event = Event.objects.create(
+            name='Python Meetup', type='meetup', language='en', info='Talks', format='online',
+            start_timestamp=datetime(2024, 5, 1, 18, tzinfo=timezone.utc), join_type='open'
+        )
+
+    def test_register_view(self):
+        self.assertEqual(self.event.register_view(self.user), (1, 1))
+        self.assertEqual(self.event.view_count(), 1)
+        self.assertEqual(self.redis.xlen(VIEWS_STREAM_KEY), 1)
+
+    def test_views_are_flushed_to_db(self):
+        self.event.register_view(self.user)
+
+        self.assertEqual(consume_view_stream('first'), 1)
+        self.assertEqual(flush_view_counters(Event), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.views_count, 1)
+        view = View.objects.get()
+        self.assertEqual((view.content_type, view.object_id), (ContentType.objects.get_for_model(Event), self.event.id))
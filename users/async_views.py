@@ -0,0 +1,22 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from common.async_views import async_api_view
+from users.models import User
+from users.serializers import MainPageSerializer
+
+
+@require_GET
+@async_api_view
+async def main_page(request):
+    """
+    Async-вариант UserViewSet.main_page для ASGI.
+    """
+    user = await User.objects.select_related('specialization') \
+        .prefetch_related('languages__language') \
+        .aget(pk=request.user.pk)
+
+    serializer = MainPageSerializer(user, context={"request": request})
+    data = await sync_to_async(lambda: serializer.data)()
+    return JsonResponse(data)
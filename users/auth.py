@@ -1,14 +1,28 @@
 import hmac
 import hashlib
 import json
+import time
+from functools import lru_cache
 from os import environ
 from urllib.parse import unquote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
+from users.cache import auth_cache, CachedUser
 from users.models import User
 
 
+@lru_cache(maxsize=8)
+def get_webapp_secret_key(bot_token: str, c_str: str = "WebAppData") -> bytes:
+    """
+    Секретный ключ WebAppData зависит только от токена бота, поэтому вычисляется один раз.
+    """
+    return hmac.new(c_str.encode(), bot_token.encode(), hashlib.sha256).digest()
+
+
 class TelegramTokenAuthentication(BaseAuthentication):
     keyword = 'tma'
 
@@ -16,24 +30,50 @@ class TelegramTokenAuthentication(BaseAuthentication):
         """
         1) Достаем заголовок Authorization,
         2) Проверяем префикс "tma ",
-        3) Валидируем токен,
+        3) Ищем уже проверенный токен в кэше, иначе валидируем его,
         4) Возвращаем (user, None) если всё ок
         """
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header.startswith(f'{self.keyword} '):
+        token = self.get_token(request)
+        if token is None:
             return None
 
-        token = auth_header.replace(f'{self.keyword} ', '').strip()
+        token_key = auth_cache.make_key(token)
+
+        snapshot = auth_cache.get(token_key)
+        if snapshot is not None:
+            if snapshot['is_blocked']:
+                raise AuthenticationFailed("User is blocked")
+            return (CachedUser(snapshot), None)
+
         validated, user_dict, error = self.validate_telegram_token(token)
         if not validated:
             raise AuthenticationFailed(error)
 
         user, _ = User.login(user_dict)
+        auth_cache.set(token_key, user, self.get_token_expires_at(token))
         if user.is_blocked:
             raise AuthenticationFailed("User is blocked")
 
         return (user, None)
 
+    def get_token(self, request):
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith(f'{self.keyword} '):
+            return None
+        return auth_header.replace(f'{self.keyword} ', '').strip()
+
+    @classmethod
+    def get_token_expires_at(cls, token: str) -> float:
+        """
+        Момент, после которого initData больше не кэшируется: auth_date + TELEGRAM_INIT_DATA_MAX_AGE.
+        Токены без auth_date не кэшируются.
+        """
+        try:
+            auth_date = int(cls.parse_token(token)['auth_date'])
+        except (KeyError, ValueError):
+            return time.time()
+        return auth_date + settings.TELEGRAM_INIT_DATA_MAX_AGE
+
     @classmethod
     def validate_telegram_token(cls, token: str):
         """
@@ -84,7 +124,41 @@ class TelegramTokenAuthentication(BaseAuthentication):
         )
         init_data = "\n".join([f"{rec[0]}={rec[1]}" for rec in init_data])
 
-        secret_key = hmac.new(c_str.encode(), bot_token.encode(), hashlib.sha256).digest()
+        secret_key = get_webapp_secret_key(bot_token, c_str)
         data_check = hmac.new(secret_key, init_data.encode(), hashlib.sha256)
 
         return data_check.hexdigest() == hash_str
+
+
+class AsyncTelegramTokenAuthentication(TelegramTokenAuthentication):
+    """
+    Вариант TelegramTokenAuthentication для async-обработчиков под ASGI.
+
+    Кэш проверенных initData читается через асинхронный клиент Redis, поэтому
+    повторные запросы не занимают поток и соединение с БД. В пул потоков уходит
+    только промах кэша (User.login), т.е. один раз на initData.
+    """
+
+    async def aauthenticate(self, request):
+        token = self.get_token(request)
+        if token is None:
+            return None
+
+        token_key = auth_cache.make_key(token)
+
+        snapshot = await auth_cache.aget(token_key)
+        if snapshot is not None:
+            if snapshot['is_blocked']:
+                raise AuthenticationFailed("User is blocked")
+            return (CachedUser(snapshot), None)
+
+        validated, user_dict, error = self.validate_telegram_token(token)
+        if not validated:
+            raise AuthenticationFailed(error)
+
+        user, _ = await sync_to_async(User.login)(user_dict)
+        await auth_cache.aset(token_key, user, self.get_token_expires_at(token))
+        if user.is_blocked:
+            raise AuthenticationFailed("User is blocked")
+
+        return (user, None)
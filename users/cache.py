@@ -0,0 +1,203 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+from redis import RedisError
+
+from common.cache import LocalLRUCache
+from common.redis import redis_client, async_redis_client
+
+TOKEN_KEY = 'auth:init_data:{}'
+USER_KEY = 'auth:user:{}'
+
+
+def make_user_snapshot(user):
+    """
+    Минимальный снимок пользователя, которого достаточно для аутентификации.
+    """
+    return {
+        'id': user.pk,
+        'tg_id': user.tg_id,
+        'is_blocked': user.is_blocked,
+    }
+
+
+class VerifiedInitDataCache:
+    """
+    Двухуровневый кэш проверенных initData: LRU в памяти процесса + Redis.
+
+    Хранит две связки:
+    - sha256(initData) -> id пользователя, TTL ограничен сроком жизни auth_date;
+    - id пользователя -> снимок (id, tg_id, is_blocked), сбрасывается при сохранении User.
+
+    Снимок в памяти процесса живет AUTH_CACHE_LOCAL_TTL секунд, поэтому блокировка
+    пользователя видна всем воркерам не позже, чем через этот интервал.
+    """
+
+    def __init__(self):
+        self.tokens = LocalLRUCache(maxsize=settings.AUTH_CACHE_LOCAL_SIZE)
+        self.users = LocalLRUCache(maxsize=settings.AUTH_CACHE_LOCAL_SIZE)
+
+    @staticmethod
+    def make_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token_key):
+        """
+        Возвращает снимок пользователя для проверенного initData или None при промахе.
+        """
+        user_id = self.tokens.get(token_key)
+        if user_id is None:
+            user_id = self._get_token_from_redis(token_key)
+            if user_id is None:
+                return None
+
+        snapshot = self.users.get(user_id)
+        if snapshot is None:
+            snapshot = self._get_user_from_redis(user_id)
+
+        return snapshot
+
+    async def aget(self, token_key):
+        """
+        Асинхронный вариант get() для ASGI-обработчиков.
+        """
+        user_id = self.tokens.get(token_key)
+        if user_id is None:
+            user_id = self._load_token(token_key, await self._aredis_get(TOKEN_KEY.format(token_key)))
+            if user_id is None:
+                return None
+
+        snapshot = self.users.get(user_id)
+        if snapshot is None:
+            snapshot = self._load_user(user_id, await self._aredis_get(USER_KEY.format(user_id)))
+
+        return snapshot
+
+    def set(self, token_key, user, expires_at):
+        """
+        Кэширует проверенный initData до expires_at (unix time), но не дольше AUTH_CACHE_TTL.
+        """
+        ttl = self._store_local(token_key, user, expires_at)
+        if ttl <= 0:
+            return
+
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            self._fill_pipeline(pipe, token_key, user, expires_at, ttl)
+            pipe.execute()
+        except RedisError:
+            pass
+
+    async def aset(self, token_key, user, expires_at):
+        ttl = self._store_local(token_key, user, expires_at)
+        if ttl <= 0:
+            return
+
+        try:
+            pipe = async_redis_client.pipeline(transaction=False)
+            self._fill_pipeline(pipe, token_key, user, expires_at, ttl)
+            await pipe.execute()
+        except RedisError:
+            pass
+
+    def _store_local(self, token_key, user, expires_at):
+        ttl = int(min(settings.AUTH_CACHE_TTL, expires_at - time.time()))
+        if ttl > 0:
+            self.tokens.set(token_key, user.pk, ttl)
+            self.users.set(user.pk, make_user_snapshot(user), settings.AUTH_CACHE_LOCAL_TTL)
+        return ttl
+
+    @staticmethod
+    def _fill_pipeline(pipe, token_key, user, expires_at, ttl):
+        pipe.set(TOKEN_KEY.format(token_key), json.dumps({'user_id': user.pk, 'expires_at': expires_at}), ex=ttl)
+        pipe.set(USER_KEY.format(user.pk), json.dumps(make_user_snapshot(user)), ex=settings.AUTH_CACHE_TTL)
+
+    def invalidate_user(self, user_id):
+        """
+        Сбрасывает снимок пользователя. Связки initData -> id остаются валидными.
+        """
+        self.users.delete(user_id)
+        try:
+            redis_client.delete(USER_KEY.format(user_id))
+        except RedisError:
+            pass
+
+    def _get_token_from_redis(self, token_key):
+        try:
+            raw = redis_client.get(TOKEN_KEY.format(token_key))
+        except RedisError:
+            return None
+        return self._load_token(token_key, raw)
+
+    def _get_user_from_redis(self, user_id):
+        try:
+            raw = redis_client.get(USER_KEY.format(user_id))
+        except RedisError:
+            return None
+        return self._load_user(user_id, raw)
+
+    @staticmethod
+    async def _aredis_get(key):
+        try:
+            return await async_redis_client.get(key)
+        except RedisError:
+            return None
+
+    def _load_token(self, token_key, raw):
+        if raw is None:
+            return None
+
+        data = json.loads(raw)
+        self.tokens.set(token_key, data['user_id'], data['expires_at'] - time.time())
+        return data['user_id']
+
+    def _load_user(self, user_id, raw):
+        if raw is None:
+            return None
+
+        snapshot = json.loads(raw)
+        self.users.set(user_id, snapshot, settings.AUTH_CACHE_LOCAL_TTL)
+        return snapshot
+
+
+auth_cache = VerifiedInitDataCache()
+
+
+def _snapshot_property(name):
+    def getter(self):
+        if self._wrapped is empty:
+            return self._snapshot[name]
+        return getattr(self._wrapped, name)
+
+    return property(getter)
+
+
+class CachedUser(SimpleLazyObject):
+    """
+    Пользователь, восстановленный из снимка кэша аутентификации.
+
+    id, pk, tg_id и is_blocked берутся из снимка без обращения к БД;
+    при доступе к любому другому атрибуту пользователь лениво загружается из БД.
+    """
+
+    def __init__(self, snapshot):
+        from users.models import User
+
+        self.__dict__['_snapshot'] = snapshot
+        super().__init__(lambda: User.objects.get(pk=snapshot['id']))
+
+    id = _snapshot_property('id')
+    pk = _snapshot_property('id')
+    tg_id = _snapshot_property('tg_id')
+    is_blocked = _snapshot_property('is_blocked')
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
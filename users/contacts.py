@@ -0,0 +1,91 @@
+from django.db import connection, transaction
+from django.db.models import Q
+
+from users.models import ApprovedContact
+
+CONTACT_LOCK_KEY = 'approved_contact:{}:{}'
+
+
+def lock_pairs(pairs):
+    """
+    Транзакционные advisory-блокировки пар (в порядке ключей, чтобы не было взаимоблокировок).
+    """
+    keys = sorted(CONTACT_LOCK_KEY.format(creator_id, candidate_id) for creator_id, candidate_id in pairs)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtextextended(key, 0)) "
+            "FROM (SELECT key FROM unnest(%s::text[]) AS key ORDER BY key) AS keys",
+            [keys]
+        )
+
+
+def refresh_contacts(pairs):
+    """
+    Синхронизирует ApprovedContact для пар (creator_id, candidate_id) с откликами:
+    пара есть, если у кандидата есть одобренный отклик на вакансию создателя.
+    Вызывается в транзакции изменения откликов; пары проверяются одним запросом.
+
+    Пересчет пары выполняется под блокировкой до конца транзакции: иначе при READ COMMITTED
+    одновременные одобрение и отмена одобрения разных откликов одной пары могли оставить ее без строки.
+    """
+    from vacancies.models import VacancyResponse
+
+    pairs = set(pairs)
+    if not pairs:
+        return
+
+    with transaction.atomic():
+        lock_pairs(pairs)
+
+        condition = Q()
+        for creator_id, candidate_id in pairs:
+            condition |= Q(vacancy__creator_id=creator_id, user_id=candidate_id)
+
+        approved = set(
+            VacancyResponse.objects.filter(condition, status='approved')
+            .values_list('vacancy__creator_id', 'user_id')
+            .distinct()
+        )
+
+        stale = pairs - approved
+        if stale:
+            stale_condition = Q()
+            for creator_id, candidate_id in stale:
+                stale_condition |= Q(creator_id=creator_id, candidate_id=candidate_id)
+            ApprovedContact.objects.filter(stale_condition).delete()
+        ApprovedContact.objects.bulk_create(
+            [ApprovedContact(creator_id=creator_id, candidate_id=candidate_id)
+             for creator_id, candidate_id in approved],
+            ignore_conflicts=True
+        )
+
+
+def rebuild_contacts():
+    """
+    Полностью пересобирает ApprovedContact по откликам. Возвращает количество пар.
+    """
+    from vacancies.models import VacancyResponse
+
+    pairs = VacancyResponse.objects.filter(status='approved') \
+        .values_list('vacancy__creator_id', 'user_id').distinct()
+    with transaction.atomic():
+        ApprovedContact.objects.all().delete()
+        contacts = ApprovedContact.objects.bulk_create(
+            [ApprovedContact(creator_id=creator_id, candidate_id=candidate_id) for creator_id, candidate_id in pairs],
+            batch_size=1000
+        )
+    return len(contacts)
+
+
+def get_visible_username_ids(viewer, user_ids):
+    """
+    Возвращает множество id из user_ids, чей username виден viewer, одним запросом.
+    """
+    user_ids = list(user_ids)
+    if viewer is None or viewer.pk is None or not user_ids:
+        return set()
+
+    rows = ApprovedContact.objects.filter(
+        Q(creator_id=viewer.pk, candidate_id__in=user_ids) | Q(candidate_id=viewer.pk, creator_id__in=user_ids)
+    ).values_list('creator_id', 'candidate_id')
+    return {candidate_id if creator_id == viewer.pk else creator_id for creator_id, candidate_id in rows}
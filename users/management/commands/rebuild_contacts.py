@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.contacts import rebuild_contacts
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает пары создатель — кандидат с одобренными откликами (видимость username)'
+
+    def handle(self, *args, **options):
+        count = rebuild_contacts()
+        self.stdout.write(self.style.SUCCESS(f'Пар контактов: {count}'))
@@ -1,10 +1,13 @@
 from datetime import date
 
 from django.contrib.auth.models import AbstractUser
+from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from redis import RedisError
 
 from common.models import Specialization, Skill, LanguageProficiency
+from common.redis import redis_client
 from django.utils.translation import gettext_lazy as _
 
 
@@ -60,12 +63,19 @@ class User(AbstractUser):
     visibility = models.CharField(max_length=50, choices=VISIBILITY_CHOICES, default='public')
     tg_id = models.BigIntegerField(unique=True, null=True, blank=True, verbose_name='Telegram ID')
     SAFE_FIELDS = ['first_name', 'last_name', 'username', 'photo_url', 'bio']
+    # Поля, которые ведет Telegram: только они обновляются из данных логина у существующих пользователей
+    TELEGRAM_FIELDS = ['first_name', 'last_name', 'username', 'photo_url']
 
     def __str__(self):
         return self.first_name or self.username
 
     @classmethod
     def login(cls, user_dict):
+        """
+        Возвращает пользователя по tg_id обычным чтением по индексу.
+        Вставка выполняется только для неизвестных пользователей, а обновление
+        профиля из TELEGRAM_FIELDS откладывается (см. schedule_profile_refresh).
+        """
         tg_id = user_dict.get('id')
         if not tg_id:
             raise ValueError("User ID (Telegram ID) is required for login.")
@@ -76,11 +86,50 @@ class User(AbstractUser):
             if key in user_dict
         }
 
-        user, was_created = cls.objects.get_or_create(
-            tg_id=tg_id,
-            defaults=defaults_dict
-        )
-        return user, was_created
+        user = cls.objects.filter(tg_id=tg_id).first()
+        if user is not None:
+            user.schedule_profile_refresh({
+                key: value for key, value in defaults_dict.items() if key in cls.TELEGRAM_FIELDS
+            })
+            return user, False
+
+        try:
+            with transaction.atomic():
+                return cls.objects.create(tg_id=tg_id, **defaults_dict), True
+        except IntegrityError:
+            # Пользователя успел создать параллельный запрос
+            user = cls.objects.filter(tg_id=tg_id).first()
+            if user is None:
+                raise
+            return user, False
+
+    def schedule_profile_refresh(self, profile_fields):
+        """
+        Ставит в очередь обновление полей профиля, пришедших из Telegram,
+        не чаще одного раза в USER_PROFILE_REFRESH_INTERVAL секунд на пользователя.
+        Вместе с новыми значениями передаются текущие: задача не перезапишет поле,
+        измененное в приложении после постановки в очередь.
+        """
+        from users.tasks import refresh_user_profile
+
+        changed = {
+            key: value
+            for key, value in profile_fields.items()
+            if getattr(self, key) != value
+        }
+        if not changed:
+            return
+
+        try:
+            acquired = redis_client.set(
+                f'users:profile_refresh:{self.pk}', 1,
+                nx=True, ex=settings.USER_PROFILE_REFRESH_INTERVAL
+            )
+        except RedisError:
+            return
+
+        if acquired:
+            refresh_user_profile.delay(self.pk, changed, {key: getattr(self, key) for key in changed})
 
     total_experience = models.IntegerField(default=0)
 
@@ -113,16 +162,12 @@ class User(AbstractUser):
 
     def should_show_username(self, viewer):
         """
-        Определяет, можно ли показывать username этому пользователю.
+        Определяет, можно ли показывать username этому пользователю:
+        у них есть одобренный отклик на вакансию одного из них (users.contacts).
+        Для списка пользователей используйте get_visible_username_ids — один запрос на страницу.
         """
-        from vacancies.models import VacancyResponse
-        if VacancyResponse.objects.filter(user=self, vacancy__creator=viewer, status='approved').exists():
-            return True
-
-        if VacancyResponse.objects.filter(user=viewer, vacancy__creator=self, status='approved').exists():
-            return True
-
-        return False
+        from users.contacts import get_visible_username_ids
+        return self.pk in get_visible_username_ids(viewer, [self.pk])
 
 
 class Education(models.Model):
@@ -219,3 +264,24 @@ class Experience(models.Model):
     def is_current_job(self):
         """Определяет, является ли это место работы текущим."""
         return self.end_date is None
+
+
+class ApprovedContact(models.Model):
+    """
+    Пара создатель вакансии — кандидат, у которой есть хотя бы один одобренный отклик.
+    Поддерживается при изменении откликов (users.contacts.refresh_contacts),
+    по ней определяется видимость username.
+    """
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name='approved_candidates')
+    candidate = models.ForeignKey(User, on_delete=models.CASCADE, related_name='approved_creators')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['creator', 'candidate'], name='unique_approved_contact')
+        ]
+        indexes = [
+            models.Index(fields=['candidate', 'creator'], name='approved_contact_candidate_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.creator} <-> {self.candidate}'
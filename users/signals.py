@@ -1,7 +1,9 @@
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from users.models import Experience
+from users.cache import auth_cache
+from users.models import Experience, User
 
 
 @receiver(post_save, sender=Experience)
@@ -12,3 +14,13 @@ def update_user_experience(sender, instance, **kwargs):
     """
     user = instance.user
     user.calculate_total_experience()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_auth_cache(sender, instance, **kwargs):
+    """
+    Сбрасывает снимок пользователя в кэше аутентификации (в т.ч. при смене is_blocked).
+    """
+    user_id = instance.pk
+    transaction.on_commit(lambda: auth_cache.invalidate_user(user_id))
@@ -0,0 +1,36 @@
+from django.db import IntegrityError
+from django.db.models import Case, F, Q, Value, When
+
+from core.celery import celery_app as app
+from users.models import User
+
+
+@app.task
+def refresh_user_profile(user_id, profile_fields, previous_fields):
+    """
+    Записывает поля профиля, пришедшие из Telegram при логине, одним UPDATE.
+    Поле меняется, только если в БД еще лежит значение previous_fields на момент постановки в очередь:
+    изменения, сделанные в приложении после этого, не перезаписываются.
+    Если новый username уже занят другим пользователем, он пропускается.
+    """
+    fields = {key: value for key, value in profile_fields.items() if key in User.TELEGRAM_FIELDS}
+    if not fields:
+        return
+
+    try:
+        update_profile_fields(user_id, fields, previous_fields)
+    except IntegrityError:
+        fields.pop('username', None)
+        if fields:
+            update_profile_fields(user_id, fields, previous_fields)
+
+
+def update_profile_fields(user_id, fields, previous_fields):
+    User.objects.filter(pk=user_id).update(**{
+        key: Case(
+            When(Q(**{key: previous_fields.get(key)}), then=Value(value)),
+            default=F(key),
+            output_field=User._meta.get_field(key)
+        )
+        for key, value in fields.items()
+    })
@@ -0,0 +1,93 @@
+import time
+from unittest.mock import patch, AsyncMock
+
+from django.test import TestCase
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from users.auth import TelegramTokenAuthentication, AsyncTelegramTokenAuthentication
+from users.cache import auth_cache
+from users.models import User
+from users.tests.utils import create_valid_token
+
+BOT_TOKEN = 'test_bot_token'
+
+
+@patch.dict('os.environ', {'BOT_TOKEN': BOT_TOKEN})
+@patch('users.cache.redis_client')
+class TelegramTokenAuthenticationCacheTest(TestCase):
+    def setUp(self):
+        auth_cache.tokens.clear()
+        auth_cache.users.clear()
+        self.user = User.objects.create(first_name='John', username='johndoe', tg_id=123456789)
+        self.auth = TelegramTokenAuthentication()
+        self.factory = APIRequestFactory()
+
+    def make_request(self, auth_date):
+        token = create_valid_token(BOT_TOKEN, {'id': self.user.tg_id, 'first_name': 'John'}, auth_date)
+        return self.factory.get('/', HTTP_AUTHORIZATION=f'tma {token}')
+
+    def test_repeated_request_skips_validation_and_db(self, redis_mock):
+        redis_mock.get.return_value = None
+        request = self.make_request(int(time.time()))
+
+        user, _ = self.auth.authenticate(request)
+        self.assertEqual(user.pk, self.user.pk)
+
+        with patch.object(TelegramTokenAuthentication, 'validate_telegram_token') as validate, \
+                self.assertNumQueries(0):
+            cached_user, _ = self.auth.authenticate(request)
+            self.assertEqual(cached_user.pk, self.user.pk)
+            self.assertEqual(cached_user.tg_id, self.user.tg_id)
+        validate.assert_not_called()
+
+    def test_blocking_user_invalidates_cache(self, redis_mock):
+        redis_mock.get.return_value = None
+        request = self.make_request(int(time.time()))
+        self.auth.authenticate(request)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_blocked = True
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(request)
+
+    def test_expired_init_data_is_not_cached(self, redis_mock):
+        redis_mock.get.return_value = None
+        request = self.make_request(int(time.time()) - 2 * 60 * 60 * 24)
+        self.auth.authenticate(request)
+
+        with patch.object(TelegramTokenAuthentication, 'validate_telegram_token',
+                          wraps=TelegramTokenAuthentication.validate_telegram_token) as validate:
+            self.auth.authenticate(request)
+        validate.assert_called_once()
+
+
+@patch.dict('os.environ', {'BOT_TOKEN': BOT_TOKEN})
+@patch('users.cache.async_redis_client')
+class AsyncTelegramTokenAuthenticationTest(TestCase):
+    def setUp(self):
+        auth_cache.tokens.clear()
+        auth_cache.users.clear()
+        self.user = User.objects.create(first_name='John', username='johndoe', tg_id=123456789)
+        self.auth = AsyncTelegramTokenAuthentication()
+        self.factory = APIRequestFactory()
+
+    async def test_cached_token_is_served_without_validation(self, redis_mock):
+        redis_mock.get = AsyncMock(return_value=None)
+        redis_mock.pipeline.return_value.execute = AsyncMock()
+        token = create_valid_token(BOT_TOKEN, {'id': self.user.tg_id, 'first_name': 'John'}, int(time.time()))
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'tma {token}')
+
+        user, _ = await self.auth.aauthenticate(request)
+        self.assertEqual(user.pk, self.user.pk)
+
+        with patch.object(AsyncTelegramTokenAuthentication, 'validate_telegram_token') as validate:
+            cached_user, _ = await self.auth.aauthenticate(request)
+        self.assertEqual(cached_user.pk, self.user.pk)
+        validate.assert_not_called()
+
+    async def test_missing_header_returns_none(self, redis_mock):
+        request = self.factory.get('/')
+        self.assertIsNone(await self.auth.aauthenticate(request))
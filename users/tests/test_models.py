@@ -1,5 +1,10 @@
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from users.models import User, Specialization, Skill, Experience, Education, AdditionalEducation, UserBook
 
 from vacancies.models import Vacancy
@@ -65,9 +70,83 @@ class UserModelTest(TestCase):
         )
 
         from vacancies.models import VacancyResponse
-        VacancyResponse.objects.create(user=self.user, vacancy=vacancy, status='approved')
+        response = VacancyResponse.objects.create(user=self.user, vacancy=vacancy, status='approved')
+        self.assertTrue(self.user.should_show_username(viewer))
+        self.assertTrue(viewer.should_show_username(self.user))
+
+        response.status = 'rejected'
+        response.save()
+        self.assertFalse(self.user.should_show_username(viewer))
+
+        VacancyResponse.bulk_set_status([response.id], 'approved', viewer.id)
         self.assertTrue(self.user.should_show_username(viewer))
 
+    def test_get_visible_username_ids(self):
+        from users.contacts import get_visible_username_ids
+        from vacancies.models import VacancyResponse
+
+        creator = User.objects.create(username='creator', first_name='Creator')
+        other = User.objects.create(username='other', first_name='Other')
+        vacancy = Vacancy.objects.create(title='Python Backend Developer', creator=creator)
+        VacancyResponse.objects.create(user=self.user, vacancy=vacancy, status='approved')
+        VacancyResponse.objects.create(user=other, vacancy=vacancy, status='pending')
+
+        with self.assertNumQueries(1):
+            visible = get_visible_username_ids(creator, [self.user.id, other.id])
+        self.assertEqual(visible, {self.user.id})
+
+
+@patch('users.tasks.refresh_user_profile.delay')
+@patch('users.models.redis_client')
+class UserLoginTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(first_name='John', username='johndoe', tg_id=123456789)
+
+    def test_login_existing_user_is_read_only(self, redis_mock, delay_mock):
+        with self.assertNumQueries(1):
+            user, created = User.login({'id': 123456789, 'first_name': 'John', 'username': 'johndoe'})
+
+        self.assertFalse(created)
+        self.assertEqual(user.pk, self.user.pk)
+        delay_mock.assert_not_called()
+
+    def test_login_creates_unknown_user(self, redis_mock, delay_mock):
+        user, created = User.login({'id': 987654321, 'first_name': 'Jane', 'username': 'janedoe'})
+
+        self.assertTrue(created)
+        self.assertEqual(user.tg_id, 987654321)
+        self.assertEqual(user.first_name, 'Jane')
+
+    def test_login_schedules_profile_refresh_once(self, redis_mock, delay_mock):
+        redis_mock.set.side_effect = [True, None]
+        user_dict = {'id': 123456789, 'first_name': 'Johnny', 'photo_url': 'http://example.com/new.jpg'}
+
+        User.login(user_dict)
+        User.login(user_dict)
+
+        delay_mock.assert_called_once_with(
+            self.user.pk, {'first_name': 'Johnny', 'photo_url': 'http://example.com/new.jpg'},
+            {'first_name': 'John', 'photo_url': None}
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, 'John')
+
+    def test_login_does_not_refresh_app_owned_fields(self, redis_mock, delay_mock):
+        User.login({'id': 123456789, 'first_name': 'John', 'username': 'johndoe', 'bio': 'From Telegram'})
+        delay_mock.assert_not_called()
+
+    def test_refresh_keeps_fields_edited_after_scheduling(self, redis_mock, delay_mock):
+        from users.tasks import refresh_user_profile
+
+        User.objects.filter(pk=self.user.pk).update(first_name='Edited')
+        refresh_user_profile(
+            self.user.pk, {'first_name': 'Johnny', 'photo_url': 'http://example.com/new.jpg'},
+            {'first_name': 'John', 'photo_url': None}
+        )
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.first_name, self.user.photo_url), ('Edited', 'http://example.com/new.jpg'))
+
 
 class EducationModelTest(TestCase):
     def setUp(self):
@@ -134,7 +213,13 @@ class UserBookModelTest(TestCase):
             )
 
 
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
 class AdditionalEducationModelTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
     def setUp(self):
         self.user = User.objects.create_user(
             username='johndoe',
@@ -4,17 +4,20 @@ import hashlib
 from urllib.parse import quote, unquote
 
 
-def create_valid_token(secret_key, user_data):
+def create_valid_token(secret_key, user_data, auth_date=None):
     """
     Создаёт валидный токен для тестов.
     :param secret_key: Секретный ключ (BOT_TOKEN).
     :param user_data: Данные пользователя (dict).
+    :param auth_date: Время авторизации (unix time), по умолчанию не передаётся.
     :return: Строка токена вида: "hash=abc123&user=..."
     """
     user_json = json.dumps(user_data)
     user_encoded = quote(user_json)
 
     init_data = f"user={user_encoded}"
+    if auth_date is not None:
+        init_data = f"auth_date={auth_date}&{init_data}"
 
     init_data_sorted = sorted(
         [chunk.split("=") for chunk in unquote(init_data).split("&")],
@@ -1,5 +1,7 @@
+from django.urls import path
 from rest_framework import routers
 
+from users.async_views import main_page
 from users.views import UserViewSet, EducationViewSet, AdditionalEducationViewSet, ExperienceViewSet
 
 app_name = 'users'
@@ -18,3 +20,7 @@ experience_router.register(r'', ExperienceViewSet, basename='experiences')
 
 user_book_router = routers.DefaultRouter()
 
+# Async-обработчики для ASGI-деплоя
+user_async_urlpatterns = [
+    path('main/', main_page, name='users-async-main-page'),
+]
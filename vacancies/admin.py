@@ -1,7 +1,7 @@
 from django.contrib import admin
 
 from common.admin import LanguageProficiencyInline
-from vacancies.models import Vacancy, VacancyResponse
+from vacancies.models import Vacancy, VacancyResponse, ExchangeRate
 
 @admin.register(Vacancy)
 class VacancyAdmin(admin.ModelAdmin):
@@ -12,3 +12,8 @@ class VacancyAdmin(admin.ModelAdmin):
 @admin.register(VacancyResponse)
 class VacancyResponseAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ('currency', 'usd_rate', 'updated_at')
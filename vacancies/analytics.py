@@ -0,0 +1,137 @@
+from datetime import date, timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from redis import RedisError
+
+from common.redis import redis_client
+from vacancies.models import Vacancy, VacancyResponse, VacancyResponseDailyRollup
+from views.models import ViewDailyRollup
+
+DIRTY_KEY = 'vacancy_analytics:dirty'
+BATCH_SIZE = 500
+
+
+def mark_responses_changed(vacancy_id):
+    """
+    Помечает вакансию для пересчета агрегатов откликов фоновой задачей.
+    """
+    try:
+        redis_client.sadd(DIRTY_KEY, vacancy_id)
+    except RedisError:
+        pass
+
+
+def rollup_vacancy_responses(vacancy_ids):
+    """
+    Пересчитывает дневные агрегаты откликов указанных вакансий одним GROUP BY по (vacancy, day, status).
+    """
+    rows = VacancyResponse.objects.filter(vacancy_id__in=vacancy_ids) \
+        .annotate(day=TruncDate('created_at')) \
+        .values('vacancy_id', 'day', 'status') \
+        .annotate(count=Count('id')) \
+        .order_by()
+
+    rollups = [VacancyResponseDailyRollup(**row) for row in rows]
+    with transaction.atomic():
+        VacancyResponseDailyRollup.objects.filter(vacancy_id__in=vacancy_ids).delete()
+        VacancyResponseDailyRollup.objects.bulk_create(rollups, batch_size=BATCH_SIZE)
+
+
+def rollup_dirty_vacancies():
+    """
+    Пересчитывает агрегаты для всех помеченных вакансий. Возвращает количество вакансий.
+
+    Пометки снимаются до пересчета, чтобы изменения во время пересчета пометили вакансию заново,
+    а при ошибке записи возвращаются в множество.
+    """
+    count = 0
+    while True:
+        vacancy_ids = redis_client.spop(DIRTY_KEY, BATCH_SIZE)
+        if not vacancy_ids:
+            break
+        try:
+            rollup_vacancy_responses([int(vacancy_id) for vacancy_id in vacancy_ids])
+        except Exception:
+            redis_client.sadd(DIRTY_KEY, *vacancy_ids)
+            raise
+        count += len(vacancy_ids)
+    return count
+
+
+def get_vacancy_analytics(vacancy, days=30):
+    """
+    Статистика вакансии из агрегатов: просмотры и отклики по дням за последние days дней,
+    конверсия просмотров в отклики и воронка статусов откликов за все время.
+    Для родительской фриланс-вакансии в том же запросе суммируются дочерние.
+    """
+    vacancy_ids = Vacancy.objects.filter(Q(id=vacancy.id) | Q(parent_vacancy_id=vacancy.id)).values('id')
+    since = date.today() - timedelta(days=days - 1)
+
+    views = ViewDailyRollup.objects.filter(
+        content_type=ContentType.objects.get_for_model(Vacancy),
+        object_id__in=vacancy_ids
+    ).values('day').annotate(views=Sum('views'), unique_viewers=Sum('unique_viewers')).order_by('day')
+
+    responses = VacancyResponseDailyRollup.objects.filter(vacancy_id__in=vacancy_ids) \
+        .values('day', 'status').annotate(count=Sum('count')).order_by('day')
+
+    views = list(views)
+    total_views = sum(row['views'] for row in views)
+
+    funnel = {value: 0 for value, _ in VacancyResponse.STATUS_CHOICES}
+    responses_per_day = {}
+    for row in responses:
+        funnel[row['status']] = funnel.get(row['status'], 0) + row['count']
+        if row['day'] >= since:
+            responses_per_day[row['day']] = responses_per_day.get(row['day'], 0) + row['count']
+    total_responses = sum(funnel.values())
+
+    return {
+        'vacancy_id': vacancy.id,
+        'views_per_day': [row for row in views if row['day'] >= since],
+        'responses_per_day': [{'day': day, 'responses': count} for day, count in responses_per_day.items()],
+        'status_funnel': funnel,
+        'total_views': total_views,
+        'total_responses': total_responses,
+        'conversion': round(total_responses / total_views, 4) if total_views else None,
+    }
+
+
+def get_response_summary(vacancy):
+    """
+    Одним запросом возвращает вакансию и ее дочерние вакансии (для фриланс-родителя)
+    со специализациями и количеством откликов по статусам.
+
+    Связи со специализациями и откликами размножают строки, поэтому отклики считаются через DISTINCT.
+    """
+    status_counts = {
+        status: Count('responses', filter=Q(responses__status=status), distinct=True)
+        for status, _ in VacancyResponse.STATUS_CHOICES
+    }
+    rows = Vacancy.objects.filter(Q(id=vacancy.id) | Q(parent_vacancy_id=vacancy.id)) \
+        .values('id') \
+        .annotate(
+            specializations_names=ArrayAgg('specializations__name', distinct=True),
+            total=Count('responses', distinct=True),
+            new=Count('responses', filter=Q(responses__is_viewed=False), distinct=True),
+            **status_counts
+        ) \
+        .order_by('id')
+
+    summary = {
+        'vacancy_ids': [],
+        'children': [],
+        'counts': {name: 0 for name in ['total', 'new', *status_counts]},
+    }
+    for row in rows:
+        summary['vacancy_ids'].append(row['id'])
+        for name in summary['counts']:
+            summary['counts'][name] += row[name]
+        if row['id'] != vacancy.id:
+            names = [name for name in row.pop('specializations_names') if name]
+            summary['children'].append({**row, 'specialization': names[0] if names else None})
+    return summary
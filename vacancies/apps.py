@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VacanciesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vacancies'
+
+    def ready(self):
+        import vacancies.signals
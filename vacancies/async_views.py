@@ -0,0 +1,56 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, Http404, HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+
+from common.async_views import async_api_view
+from vacancies.cache import feed_cache, vacancy_detail_cache, get_detail_headers
+from vacancies.feed import get_feed_page
+from vacancies.models import Vacancy
+from vacancies.serializers import VacancyFeedSerializer, VacancyMainSerializer
+
+
+@require_GET
+@async_api_view
+async def vacancy_feed(request):
+    """
+    Async-вариант VacancyViewSet.feed для ASGI.
+    """
+    queryset = VacancyFeedSerializer.setup_eager_loading(Vacancy.objects.all())
+    compute = sync_to_async(partial(get_feed_page, queryset, request, {"request": request}))
+    data = await feed_cache.aget_or_set(request.user.pk, request.GET, compute, request.path)
+    return JsonResponse(data)
+
+
+@require_GET
+@async_api_view
+async def vacancy_detail(request, pk):
+    """
+    Async-вариант VacancyViewSet.retrieve для ASGI.
+    """
+    state = await Vacancy.objects.filter(pk=pk).values('id', 'version', 'views_count').afirst()
+    if state is None:
+        raise Http404
+    vacancy = Vacancy(**state)
+
+    views_count, unique_views_count = await vacancy.aregister_view(request.user)
+    headers = get_detail_headers(vacancy, views_count, unique_views_count)
+    if vacancy.get_etag() in parse_etags(request.headers.get('If-None-Match', '')):
+        return HttpResponseNotModified(headers=headers)
+
+    response_data = await vacancy_detail_cache.aget_or_set(
+        vacancy.id, vacancy.version, sync_to_async(partial(get_detail_data, request, vacancy.id))
+    )
+    response_data['views_count'] = views_count
+    response_data['unique_views_count'] = unique_views_count
+
+    return JsonResponse(response_data, headers=headers)
+
+
+def get_detail_data(request, pk):
+    instance = Vacancy.objects.select_related('creator') \
+        .prefetch_related('skills', 'specializations', 'languages') \
+        .get(id=pk)
+    return VacancyMainSerializer(instance, context={"request": request}).data
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from redis import RedisError
+
+from common.redis import redis_client, async_redis_client
+
+GLOBAL_VERSION_KEY = 'feed:version:global'
+USER_VERSION_KEY = 'feed:version:user:{}'
+PAGE_KEY = 'feed:{}:{}:{}:{}:{}'
+LOCK_KEY = 'feed:lock:{}'
+DETAIL_KEY = 'vacancy:detail:{}:{}'
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def normalize_params(params, path=''):
+    """
+    Подпись пути и набора query-параметров, не зависящая от порядка параметров.
+    """
+    normalized = sorted((key, sorted(params.getlist(key))) for key in params)
+    return hashlib.sha1(json.dumps([path, normalized]).encode()).hexdigest()
+
+
+class FeedCache:
+    """
+    Кэш сериализованных страниц ленты на пользователя.
+
+    Ключ страницы включает глобальную версию ленты (меняется при изменении вакансий),
+    версию пользователя (меняется при изменении навыков/специализации/опыта) и подпись
+    пути и query-параметров вместе с курсором (страница содержит абсолютную ссылку next,
+    поэтому синхронная и async-лента кэшируются раздельно). Инвалидация — это инкремент версии, старые
+    страницы просто истекают по FEED_CACHE_TTL.
+
+    При промахе страницу строит только один запрос (single-flight через SET NX),
+    остальные ждут его результат до FEED_CACHE_LOCK_WAIT секунд.
+    aget_or_set — то же для async-обработчиков через async_redis_client.
+
+    :param name: пространство ключей (страницы ленты, фасеты), версии у всех общие
+    :param ttl_setting: имя настройки с TTL записей
+    """
+
+    def __init__(self, name='page', ttl_setting='FEED_CACHE_TTL'):
+        self.name = name
+        self.ttl_setting = ttl_setting
+
+    def bump_global(self):
+        try:
+            redis_client.incr(GLOBAL_VERSION_KEY)
+        except RedisError:
+            pass
+
+    def bump_user(self, user_id):
+        try:
+            redis_client.incr(USER_VERSION_KEY.format(user_id))
+        except RedisError:
+            pass
+
+    def make_key(self, user_id, params, path=''):
+        versions = redis_client.mget(GLOBAL_VERSION_KEY, USER_VERSION_KEY.format(user_id))
+        return self.build_key(user_id, params, path, *versions)
+
+    async def amake_key(self, user_id, params, path=''):
+        versions = await async_redis_client.mget(GLOBAL_VERSION_KEY, USER_VERSION_KEY.format(user_id))
+        return self.build_key(user_id, params, path, *versions)
+
+    def build_key(self, user_id, params, path, global_version, user_version):
+        return PAGE_KEY.format(
+            self.name,
+            user_id,
+            int(global_version or 0),
+            int(user_version or 0),
+            normalize_params(params, path)
+        )
+
+    def get_or_set(self, user_id, params, compute, path=''):
+        """
+        Возвращает закэшированную страницу или строит ее через compute().
+        При недоступности Redis страница строится без кэша.
+        """
+        try:
+            key = self.make_key(user_id, params, path)
+            cached = redis_client.get(key)
+        except RedisError:
+            return compute()
+
+        if cached is not None:
+            return json.loads(cached)
+
+        token = uuid.uuid4().hex
+        lock_key = LOCK_KEY.format(key)
+        try:
+            acquired = redis_client.set(lock_key, token, nx=True, ex=settings.FEED_CACHE_LOCK_TIMEOUT)
+            if not acquired:
+                cached = self._wait(key)
+                if cached is not None:
+                    return json.loads(cached)
+        except RedisError:
+            return compute()
+
+        data = compute()
+        try:
+            redis_client.set(key, self.dumps(data), ex=getattr(settings, self.ttl_setting))
+            if acquired:
+                redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except RedisError:
+            pass
+        return data
+
+    async def aget_or_set(self, user_id, params, compute, path=''):
+        """
+        Async-вариант get_or_set: compute — корутинная функция.
+        """
+        try:
+            key = await self.amake_key(user_id, params, path)
+            cached = await async_redis_client.get(key)
+        except RedisError:
+            return await compute()
+
+        if cached is not None:
+            return json.loads(cached)
+
+        token = uuid.uuid4().hex
+        lock_key = LOCK_KEY.format(key)
+        try:
+            acquired = await async_redis_client.set(lock_key, token, nx=True, ex=settings.FEED_CACHE_LOCK_TIMEOUT)
+            if not acquired:
+                cached = await self._await(key)
+                if cached is not None:
+                    return json.loads(cached)
+        except RedisError:
+            return await compute()
+
+        data = await compute()
+        try:
+            await async_redis_client.set(key, self.dumps(data), ex=getattr(settings, self.ttl_setting))
+            if acquired:
+                await async_redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except RedisError:
+            pass
+        return data
+
+    @staticmethod
+    def dumps(data):
+        return json.dumps(data, cls=DjangoJSONEncoder)
+
+    @staticmethod
+    def _wait(key):
+        deadline = time.monotonic() + settings.FEED_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            cached = redis_client.get(key)
+            if cached is not None:
+                return cached
+        return None
+
+    @staticmethod
+    async def _await(key):
+        deadline = time.monotonic() + settings.FEED_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            cached = await async_redis_client.get(key)
+            if cached is not None:
+                return cached
+        return None
+
+
+feed_cache = FeedCache()
+facets_cache = FeedCache('facets', 'FEED_FACETS_CACHE_TTL')
+
+
+class VacancyDetailCache:
+    """
+    Кэш сериализованных деталей вакансии по (id, version).
+    Инвалидация не нужна: при изменении вакансии меняется version, старые записи истекают по TTL.
+    """
+
+    def get_or_set(self, vacancy_id, version, compute):
+        key = DETAIL_KEY.format(vacancy_id, version)
+        try:
+            cached = redis_client.get(key)
+        except RedisError:
+            return compute()
+
+        if cached is not None:
+            return json.loads(cached)
+
+        data = compute()
+        try:
+            redis_client.set(key, json.dumps(data, cls=DjangoJSONEncoder), ex=settings.VACANCY_DETAIL_CACHE_TTL)
+        except RedisError:
+            pass
+        return data
+
+    async def aget_or_set(self, vacancy_id, version, compute):
+        """
+        Async-вариант get_or_set: compute — корутинная функция.
+        """
+        key = DETAIL_KEY.format(vacancy_id, version)
+        try:
+            cached = await async_redis_client.get(key)
+        except RedisError:
+            return await compute()
+
+        if cached is not None:
+            return json.loads(cached)
+
+        data = await compute()
+        try:
+            await async_redis_client.set(
+                key, json.dumps(data, cls=DjangoJSONEncoder), ex=settings.VACANCY_DETAIL_CACHE_TTL
+            )
+        except RedisError:
+            pass
+        return data
+
+
+vacancy_detail_cache = VacancyDetailCache()
+
+
+def get_detail_headers(vacancy, views_count, unique_views_count):
+    headers = {'ETag': vacancy.get_etag(), 'X-Views-Count': str(views_count)}
+    if unique_views_count is not None:
+        headers['X-Unique-Views-Count'] = str(unique_views_count)
+    return headers
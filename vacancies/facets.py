@@ -0,0 +1,75 @@
+from django.db import connection
+
+from common.models import Specialization
+from vacancies.models import Vacancy
+
+# Поля вакансии, по которым считаются фасеты фильтров ленты
+FACET_FIELDS = ('type', 'job_format', 'experience', 'currency')
+TOP_SPECIALIZATIONS = 10
+
+# Параметры пагинации и сортировки не влияют на счетчики и не входят в ключ кэша
+IGNORED_PARAMS = ('cursor', 'page_size', 'ordering')
+
+
+def get_facet_params(params):
+    facet_params = params.copy()
+    for name in IGNORED_PARAMS:
+        facet_params.pop(name, None)
+    return facet_params
+
+
+def get_facets_sql(queryset):
+    vacancy_table = Vacancy._meta.db_table
+    through_table = Vacancy.specializations.through._meta.db_table
+    specialization_table = Specialization._meta.db_table
+
+    ids_sql, params = queryset.select_related(None).prefetch_related(None).order_by() \
+        .values('id').query.sql_with_params()
+
+    columns = [f'v.{field}' for field in FACET_FIELDS]
+    facet_cases = ' '.join(
+        f"WHEN GROUPING({column}) = 0 THEN '{field}'" for field, column in zip(FACET_FIELDS, columns)
+    )
+    value_cases = ' '.join(
+        f"WHEN GROUPING({column}) = 0 THEN {column}" for column in columns
+    )
+    grouping_sets = ', '.join(f'({column})' for column in columns)
+
+    sql = f"""
+        SELECT
+            CASE {facet_cases} ELSE 'specializations' END AS facet,
+            CASE {value_cases} ELSE vs.specialization_id::text END AS value,
+            MAX(s.name) AS name,
+            COUNT(DISTINCT v.id) AS count
+        FROM {vacancy_table} v
+        LEFT JOIN {through_table} vs ON vs.vacancy_id = v.id
+        LEFT JOIN {specialization_table} s ON s.id = vs.specialization_id
+        WHERE v.id IN ({ids_sql})
+        GROUP BY GROUPING SETS ({grouping_sets}, (vs.specialization_id))
+    """
+    return sql, params
+
+
+def get_facet_counts(queryset):
+    """
+    Счетчики по type/job_format/experience/currency и топ специализаций
+    для отфильтрованной ленты одним запросом с GROUPING SETS.
+    """
+    sql, params = get_facets_sql(queryset)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    facets = {field: {} for field in FACET_FIELDS}
+    specializations = []
+    for facet, value, name, count in rows:
+        if value is None:
+            continue
+        if facet == 'specializations':
+            specializations.append({'id': int(value), 'name': name, 'count': count})
+        else:
+            facets[facet][value] = count
+
+    specializations.sort(key=lambda item: (-item['count'], item['id']))
+    facets['specializations'] = specializations[:TOP_SPECIALIZATIONS]
+    return facets
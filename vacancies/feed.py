@@ -0,0 +1,30 @@
+from common.pagination import KeysetPagination
+from vacancies.index import rank_vacancies
+from vacancies.salary import filter_by_salary, order_by_salary, SalaryPagination
+from vacancies.serializers import VacancyFeedSerializer
+from vacancies.services import get_vacancy_feed_queryset
+
+
+def get_feed_page(queryset, request, context):
+    """
+    Страница ленты {'next': ..., 'results': [...]} — общая для VacancyViewSet.feed и async-ленты.
+    Параметры читаются из request.GET (у DRF Request это те же query_params).
+
+    :param queryset: вакансии с предзагрузкой для VacancyFeedSerializer
+    :param context: контекст сериализатора
+    """
+    params = request.GET
+    qs = filter_by_salary(get_vacancy_feed_queryset(queryset, params, request.user), params)
+
+    if params.get('ordering') == 'salary':
+        paginator = SalaryPagination()
+        page = paginator.paginate_queryset(order_by_salary(qs, request.user), request)
+    else:
+        paginator = KeysetPagination()
+        page = paginator.paginate_ranked(
+            lambda position, limit: rank_vacancies(qs, request.user, position, limit, params),
+            request
+        )
+
+    serializer = VacancyFeedSerializer(page, many=True, context=context)
+    return paginator.get_paginated_response(serializer.data).data
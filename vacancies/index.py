@@ -0,0 +1,313 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from django.conf import settings
+from redis import RedisError
+
+from common.redis import redis_client
+from users.models import User
+from vacancies.matching import (SKILLS_WEIGHT, SPECIALIZATION_WEIGHT, EXPERIENCE_WEIGHT,
+                                load_user_profiles, load_vacancy_profiles, get_scored_vacancies)
+from vacancies.models import Vacancy
+
+CHANGES_KEY = 'vacancy_index:changes'
+SEQ_KEY = 'vacancy_index:seq'
+
+# Номер изменения и запись в журнал появляются атомарно: прочитав seq, индекс видит все изменения до него
+MARK_CHANGED_SCRIPT = """
+local seq = redis.call('incr', KEYS[1])
+redis.call('zadd', KEYS[2], seq, ARGV[1])
+redis.call('zremrangebyrank', KEYS[2], 0, -tonumber(ARGV[2]) - 1)
+return seq
+"""
+
+# Кандидатов из индекса берется с запасом: часть отсеивается фильтрами ленты, которых нет в индексе
+RANK_OVERFETCH = 2
+
+EXPERIENCE_CODES = {value: code for code, (value, _) in enumerate(Vacancy.EXPERIENCE_CHOICES)}
+JOB_FORMAT_CODES = {value: code for code, (value, _) in enumerate(Vacancy.JOB_FORMAT_CHOICES)}
+
+# Массивы индекса, которые читает расчет оценок
+INDEX_ARRAYS = ('ids', 'experience', 'job_format', 'skill_counts', 'skill_rows', 'skill_ids',
+                'spec_rows', 'spec_ids', 'active')
+
+
+def mark_vacancy_changed(vacancy_id):
+    """
+    Сообщает индексам во всех процессах, что вакансию нужно перечитать из БД.
+    """
+    try:
+        redis_client.eval(MARK_CHANGED_SCRIPT, 2, SEQ_KEY, CHANGES_KEY, vacancy_id,
+                          settings.VACANCY_INDEX_MAX_CHANGES)
+    except RedisError:
+        pass
+
+
+def profiles_to_arrays(profiles):
+    """
+    Переводит список VacancyProfile в массивы индекса.
+    """
+    skill_counts = np.array([len(p.skill_ids) for p in profiles], dtype=np.int32)
+    spec_counts = np.array([len(p.specialization_ids) for p in profiles], dtype=np.int32)
+    rows = np.arange(len(profiles), dtype=np.int32)
+
+    return {
+        'ids': np.array([p.id for p in profiles], dtype=np.int64),
+        'experience': np.array([EXPERIENCE_CODES.get(p.experience, -1) for p in profiles], dtype=np.int8),
+        'job_format': np.array([JOB_FORMAT_CODES.get(p.job_format, -1) for p in profiles], dtype=np.int8),
+        'skill_counts': skill_counts,
+        'skill_rows': np.repeat(rows, skill_counts),
+        'skill_ids': np.fromiter((s for p in profiles for s in p.skill_ids), dtype=np.int32,
+                                 count=int(skill_counts.sum())),
+        'spec_rows': np.repeat(rows, spec_counts),
+        'spec_ids': np.fromiter((s for p in profiles for s in p.specialization_ids), dtype=np.int32,
+                                count=int(spec_counts.sum())),
+    }
+
+
+class VacancyIndex:
+    """
+    Индекс принятых вакансий в памяти процесса для векторного расчета match_score.
+
+    Навыки и специализации хранятся как разреженная матрица инцидентности
+    (номер строки вакансии + id навыка для каждой связи), поэтому оценка пользователя
+    по всем вакансиям считается одним np.bincount без обращения к БД.
+    Формула совпадает с vacancies.matching.calculate_match_score.
+
+    Изменения вакансий приходят через Redis (mark_vacancy_changed): индекс
+    сравнивает свой номер изменения с SEQ_KEY и перечитывает только измененные вакансии.
+
+    Массивы не изменяются на месте, обновление подменяет их новыми. Поэтому top_k
+    под блокировкой берет только ссылки на текущие массивы, а оценки считает без нее.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Обновление из БД выполняет один поток, остальные работают с текущим состоянием
+        self._refresh_lock = threading.Lock()
+        self._seq = 0
+        self._built_at = None
+        self._set_profiles([])
+
+    def _set_profiles(self, profiles):
+        self.__dict__.update(profiles_to_arrays(profiles))
+        self.active = np.ones(len(self.ids), dtype=bool)
+        self.positions = {int(vacancy_id): row for row, vacancy_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def build(self, profiles=None):
+        """
+        Полностью пересобирает индекс. Без profiles загружает все принятые вакансии из БД.
+        """
+        seq = self._read_seq()
+        if profiles is None:
+            profiles = load_vacancy_profiles(get_scored_vacancies())
+
+        with self._lock:
+            self._set_profiles(profiles)
+            self._seq = seq
+            self._built_at = time.monotonic()
+
+    def refresh(self, vacancy_ids):
+        """
+        Перечитывает указанные вакансии: непринятые удаляются, остальные заменяются.
+        Удаленные строки помечаются неактивными, массивы сжимаются при пересборке.
+        """
+        profiles = load_vacancy_profiles(get_scored_vacancies().filter(id__in=vacancy_ids))
+        with self._lock:
+            # Копия: старый массив может читать top_k вне блокировки
+            active = self.active.copy()
+            for vacancy_id in vacancy_ids:
+                row = self.positions.pop(int(vacancy_id), None)
+                if row is not None:
+                    active[row] = False
+            self.active = active
+            if profiles:
+                self._append(profiles)
+
+            if len(self.positions) * 2 < len(self.ids):
+                self._compact(list(self.positions.values()))
+
+    def _append(self, profiles):
+        offset = len(self.ids)
+        new = profiles_to_arrays(profiles)
+        new['skill_rows'] += offset
+        new['spec_rows'] += offset
+
+        for name, values in new.items():
+            setattr(self, name, np.concatenate([getattr(self, name), values]))
+        self.active = np.concatenate([self.active, np.ones(len(new['ids']), dtype=bool)])
+        for row, vacancy_id in enumerate(new['ids']):
+            self.positions[int(vacancy_id)] = row + offset
+
+    def _compact(self, live_rows):
+        live_rows = np.sort(np.array(live_rows, dtype=np.int32))
+        remap = np.full(len(self.ids), -1, dtype=np.int32)
+        remap[live_rows] = np.arange(len(live_rows), dtype=np.int32)
+
+        skill_mask = self.active[self.skill_rows]
+        spec_mask = self.active[self.spec_rows]
+        self.skill_rows = remap[self.skill_rows[skill_mask]]
+        self.skill_ids = self.skill_ids[skill_mask]
+        self.spec_rows = remap[self.spec_rows[spec_mask]]
+        self.spec_ids = self.spec_ids[spec_mask]
+
+        self.ids = self.ids[live_rows]
+        self.experience = self.experience[live_rows]
+        self.job_format = self.job_format[live_rows]
+        self.skill_counts = self.skill_counts[live_rows]
+        self.active = np.ones(len(live_rows), dtype=bool)
+        self.positions = {int(vacancy_id): row for row, vacancy_id in enumerate(self.ids)}
+
+    def ensure_fresh(self):
+        """
+        Применяет изменения из Redis: инкрементально, если пропущено не больше
+        VACANCY_INDEX_MAX_CHANGES изменений, иначе пересобирает индекс целиком.
+
+        Если индекс уже обновляет другой поток, возвращается сразу (индекс еще не построен — ждет его).
+        """
+        if not self._refresh_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            self._apply_changes()
+        finally:
+            self._refresh_lock.release()
+
+    def _apply_changes(self):
+        if self._built_at is None or time.monotonic() - self._built_at > settings.VACANCY_INDEX_REBUILD_INTERVAL:
+            self.build()
+            return
+
+        try:
+            seq = int(redis_client.get(SEQ_KEY) or 0)
+            if seq <= self._seq:
+                return
+            if seq - self._seq > settings.VACANCY_INDEX_MAX_CHANGES:
+                self.build()
+                return
+            changed = redis_client.zrangebyscore(CHANGES_KEY, self._seq + 1, seq)
+        except RedisError:
+            return
+
+        self.refresh([int(vacancy_id) for vacancy_id in changed])
+        with self._lock:
+            self._seq = seq
+
+    @staticmethod
+    def _read_seq():
+        try:
+            return int(redis_client.get(SEQ_KEY) or 0)
+        except RedisError:
+            return 0
+
+    def snapshot(self):
+        """
+        Согласованный набор ссылок на текущие массивы индекса.
+        """
+        with self._lock:
+            return SimpleNamespace(**{name: getattr(self, name) for name in INDEX_ARRAYS})
+
+    def score(self, user_profile, snapshot=None):
+        """
+        Оценки пользователя по всем строкам индекса (для неактивных строк значение не важно).
+        """
+        index = snapshot or self.snapshot()
+        rows = len(index.ids)
+        max_skill = max(int(index.skill_ids.max(initial=0)), max(user_profile.skill_ids, default=0))
+        user_skills = np.zeros(max_skill + 1, dtype=bool)
+        user_skills[list(user_profile.skill_ids)] = True
+
+        matched = np.bincount(index.skill_rows, weights=user_skills[index.skill_ids], minlength=rows)
+        skill_counts = np.maximum(index.skill_counts, 1)
+        scores = np.where(index.skill_counts > 0, SKILLS_WEIGHT * matched / skill_counts, 0.0)
+
+        if user_profile.specialization_id is not None:
+            spec_hits = np.bincount(index.spec_rows, weights=index.spec_ids == user_profile.specialization_id,
+                                    minlength=rows)
+            scores += SPECIALIZATION_WEIGHT * (spec_hits > 0)
+
+        experience = EXPERIENCE_CODES.get(user_profile.experience_level, -1)
+        scores += EXPERIENCE_WEIGHT * ((scores > 0) & (index.experience == experience))
+        return np.round(scores, 2)
+
+    def top_k(self, user_profile, k, after=None, job_format=None):
+        """
+        Возвращает до k пар (vacancy_id, score) в порядке (score desc, id desc).
+
+        :param after: позиция курсора (score, id), возвращаются строки строго после нее
+        :param job_format: фильтр по формату работы
+        """
+        index = self.snapshot()
+        scores = self.score(user_profile, index)
+        mask = index.active.copy()
+        if job_format is not None:
+            mask &= index.job_format == JOB_FORMAT_CODES.get(job_format, -1)
+        if after is not None:
+            after_score, after_id = after
+            mask &= (scores < after_score) | ((scores == after_score) & (index.ids < after_id))
+
+        rows = np.flatnonzero(mask)
+        if len(rows) > k:
+            # Граничное значение берется вместе со всеми равными, чтобы порядок по id был точным
+            kth = np.partition(scores[rows], len(rows) - k)[len(rows) - k]
+            rows = rows[scores[rows] >= kth]
+
+        order = np.lexsort((-index.ids[rows], -scores[rows]))[:k]
+        rows = rows[order]
+        return list(zip(index.ids[rows].tolist(), scores[rows].tolist()))
+
+
+vacancy_index = VacancyIndex()
+
+
+def get_index_filters(params):
+    """
+    Фильтры ленты, которые индекс применяет сам (только однозначные значения из его справочников).
+    """
+    job_formats = params.getlist('job_format') if params is not None else []
+    if len(job_formats) == 1 and job_formats[0] in JOB_FORMAT_CODES:
+        return {'job_format': job_formats[0]}
+    return {}
+
+
+def rank_vacancies(queryset, user, position, limit, params=None):
+    """
+    Страница ленты по индексу: порядок и match_score берутся из индекса, queryset задает фильтры.
+
+    Индекс отдает кандидатов пачками после курсора (с фильтрами, которые он хранит сам),
+    а queryset проверяет только эти id, поэтому стоимость страницы не зависит от размера ленты.
+    Возвращает вакансии с проставленным атрибутом match_score.
+    """
+    vacancy_index.ensure_fresh()
+
+    user_profiles = load_user_profiles(User.objects.filter(pk=user.pk))
+    if not user_profiles:
+        return []
+
+    filters = get_index_filters(params)
+    chunk_size = limit * RANK_OVERFETCH
+    page = []
+    while len(page) < limit:
+        ranked = vacancy_index.top_k(user_profiles[0], chunk_size, after=position, **filters)
+        if not ranked:
+            break
+
+        vacancies = queryset.in_bulk([vacancy_id for vacancy_id, _ in ranked])
+        for vacancy_id, score in ranked:
+            vacancy = vacancies.get(vacancy_id)
+            if vacancy is not None:
+                vacancy.match_score = score
+                page.append(vacancy)
+                if len(page) == limit:
+                    break
+
+        if len(ranked) < chunk_size:
+            break
+        position = ranked[-1]
+        # Фильтры отсеивают много кандидатов: следующая пачка больше
+        chunk_size *= 2
+    return page
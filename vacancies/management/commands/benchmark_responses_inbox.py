@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from common.models import Specialization
+from users.models import User
+from vacancies.analytics import get_response_summary
+from vacancies.models import Vacancy, VacancyResponse
+
+
+class Command(BaseCommand):
+    help = ('Бенчмарк входящих откликов фриланс-вакансии: создает родителя с дочерними вакансиями '
+            'и откликами, замеряет сводку и первую страницу и откатывает транзакцию')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--children', type=int, default=50)
+        parser.add_argument('--responses', type=int, default=20_000)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, children, responses, repeat, **options):
+        with transaction.atomic():
+            creator = User.objects.create(first_name='Benchmark')
+            parent = Vacancy.objects.create(title='Benchmark', creator=creator, type='freelance')
+
+            child_vacancies = []
+            for i in range(children):
+                child = Vacancy.objects.create(title=f'Benchmark {i}', creator=creator, type='freelance',
+                                               parent_vacancy=parent)
+                specialization, _ = Specialization.objects.get_or_create(name=f'Benchmark specialization {i}')
+                child.specializations.add(specialization)
+                child_vacancies.append(child)
+
+            candidates = User.objects.bulk_create(
+                [User(first_name=f'Candidate {i}', username=f'benchmark_candidate_{i}') for i in range(responses)],
+                batch_size=5000
+            )
+            statuses = [value for value, _ in VacancyResponse.STATUS_CHOICES]
+            VacancyResponse.objects.bulk_create([
+                VacancyResponse(user=candidate, vacancy=child_vacancies[i % children],
+                                status=statuses[i % len(statuses)], match_score=i % 100)
+                for i, candidate in enumerate(candidates)
+            ], batch_size=5000)
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(repeat):
+                    summary = get_response_summary(parent)
+                summary_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(VacancyResponse.objects.filter(vacancy_id__in=summary['vacancy_ids'])
+                     .select_related('user').order_by('-match_score', '-id')[:20])
+            page_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f'{children} children, {responses} responses: summary {summary_ms:.1f} ms '
+            f'({len(queries) // repeat} query), first page {page_ms:.1f} ms'
+        )
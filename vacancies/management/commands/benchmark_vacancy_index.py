@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from vacancies.index import VacancyIndex
+from vacancies.matching import VacancyProfile, UserProfile
+from vacancies.models import Vacancy
+
+
+class Command(BaseCommand):
+    help = 'Микробенчмарк индекса вакансий на синтетических данных (БД не используется)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--skills', type=int, default=3000)
+        parser.add_argument('--specializations', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, sizes, skills, specializations, repeat, **options):
+        rng = np.random.default_rng(0)
+        experiences = [value for value, _ in Vacancy.EXPERIENCE_CHOICES]
+        job_formats = [value for value, _ in Vacancy.JOB_FORMAT_CHOICES]
+        user = UserProfile(
+            id=1,
+            skill_ids=frozenset(rng.integers(1, skills, 15).tolist()),
+            specialization_id=1,
+            experience_level='middle',
+        )
+
+        for size in sizes:
+            profiles = [
+                VacancyProfile(
+                    id=vacancy_id,
+                    skill_ids=frozenset(rng.integers(1, skills, rng.integers(0, 10)).tolist()),
+                    specialization_ids=frozenset(rng.integers(1, specializations, rng.integers(1, 3)).tolist()),
+                    experience=experiences[vacancy_id % len(experiences)],
+                    job_format=job_formats[vacancy_id % len(job_formats)],
+                )
+                for vacancy_id in range(1, size + 1)
+            ]
+
+            index = VacancyIndex()
+            started = time.perf_counter()
+            index.build(profiles)
+            build_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                index.score(user)
+            score_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                index.top_k(user, 21)
+            top_k_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            self.stdout.write(
+                f'{size:>9} vacancies: build {build_ms:.0f} ms, score {score_ms:.2f} ms, top-21 {top_k_ms:.2f} ms'
+            )
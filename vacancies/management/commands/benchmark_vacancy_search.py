@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from users.models import User
+from vacancies.models import Vacancy
+from vacancies.search import search_vacancies
+
+WORDS = [
+    'python', 'django', 'backend', 'frontend', 'react', 'golang', 'kotlin', 'android', 'ios', 'devops',
+    'kubernetes', 'postgres', 'analytics', 'designer', 'product', 'manager', 'marketing', 'data', 'ml',
+    'разработчик', 'аналитик', 'дизайнер', 'тестировщик', 'менеджер', 'стажер', 'удаленно', 'офис',
+]
+TITLES = ['Developer', 'Engineer', 'Analyst', 'Designer', 'Manager', 'Разработчик', 'Аналитик']
+
+
+class Command(BaseCommand):
+    help = ('Бенчмарк полнотекстового поиска вакансий: создает синтетические вакансии, '
+            'замеряет первую страницу поиска и откатывает транзакцию (цель — меньше 20 мс на 1M строк)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1_000_000)
+        parser.add_argument('--queries', nargs='+', default=['python django', 'аналитик данных', 'react -ios'])
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, size, queries, page_size, repeat, **options):
+        rng = random.Random(0)
+        with transaction.atomic():
+            creator = User.objects.create(first_name='Benchmark', username='benchmark_search_creator')
+            for offset in range(0, size, 5000):
+                Vacancy.objects.bulk_create([
+                    Vacancy(
+                        title=f'{rng.choice(TITLES)} {rng.choice(WORDS)}',
+                        company_name=f'Company {i % 1000}',
+                        description=' '.join(rng.choices(WORDS, k=30)),
+                        creator=creator,
+                        approval_status='accepted',
+                    )
+                    for i in range(offset, min(offset + 5000, size))
+                ])
+            Vacancy.objects.filter(creator=creator).update(search_vector=Vacancy.get_search_vector())
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {Vacancy._meta.db_table}')
+
+            for text in queries:
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    list(search_vacancies(Vacancy.objects.all(), text, creator)
+                         .order_by('-search_rank', '-id')[:page_size + 1])
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                self.stdout.write(
+                    f'{size} vacancies, "{text}": median {timings[len(timings) // 2]:.1f} ms, '
+                    f'p95 {timings[int(len(timings) * 0.95) - 1]:.1f} ms'
+                )
+
+            transaction.set_rollback(True)
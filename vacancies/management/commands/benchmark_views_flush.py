@@ -0,0 +1,52 @@
+import json
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from common.redis import redis_client
+from users.models import User
+from vacancies.models import Vacancy
+from vacancies.tasks import consume_view_stream
+
+BENCHMARK_KEY = 'benchmark:vacancy_views'
+BENCHMARK_GROUP = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = ('Бенчмарк переноса просмотров из Redis в БД: заполняет отдельный поток синтетическими '
+            'просмотрами, записывает их одним потребителем и откатывает транзакцию')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, views, batch_size, **options):
+        redis_client.delete(BENCHMARK_KEY)
+
+        with transaction.atomic():
+            user = User.objects.create(first_name='Benchmark')
+            vacancy = Vacancy.objects.create(title='Benchmark', creator=user)
+            view_data = json.dumps({"user_id": user.id, "vacancy_id": vacancy.id, "timestamp": now().isoformat()})
+
+            for offset in range(0, views, batch_size):
+                pipe = redis_client.pipeline(transaction=False)
+                for _ in range(min(batch_size, views - offset)):
+                    pipe.xadd(BENCHMARK_KEY, {'data': view_data})
+                pipe.execute()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            count = consume_view_stream('benchmark', BENCHMARK_KEY, BENCHMARK_GROUP, batch_size)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            transaction.set_rollback(True)
+
+        redis_client.delete(BENCHMARK_KEY)
+        self.stdout.write(
+            f'{count} views in {elapsed:.1f} s ({count / elapsed:.0f}/s), peak memory {peak / 2 ** 20:.1f} MiB'
+        )
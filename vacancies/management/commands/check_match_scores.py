@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vacancies.matching import check_match_scores
+
+
+class Command(BaseCommand):
+    help = 'Сверяет сохраненные оценки соответствия с рассчитанными заново'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Проверить только указанных пользователей (можно несколько раз)')
+
+    def handle(self, *args, user_ids=None, **options):
+        mismatches = check_match_scores(user_ids)
+        for user_id, vacancy_id, stored, expected in mismatches:
+            self.stdout.write(f'user={user_id} vacancy={vacancy_id} stored={stored} expected={expected}')
+
+        if mismatches:
+            raise CommandError(f'Найдено расхождений: {len(mismatches)}')
+        self.stdout.write(self.style.SUCCESS('Оценки совпадают'))
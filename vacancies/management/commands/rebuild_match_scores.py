@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from vacancies.matching import rebuild_match_scores
+
+
+class Command(BaseCommand):
+    help = 'Полностью пересобирает таблицу оценок соответствия пользователей вакансиям и оценки откликов'
+
+    def handle(self, *args, **options):
+        count = rebuild_match_scores()
+        self.stdout.write(self.style.SUCCESS(f'Пересчитаны оценки для {count} пользователей'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from vacancies.salary import recompute_salaries
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает зарплаты вакансий в USD в месяц (после добавления полей или смены курсов)'
+
+    def handle(self, *args, **options):
+        count = recompute_salaries()
+        self.stdout.write(self.style.SUCCESS(f'Обновлено вакансий: {count}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from vacancies.models import Vacancy
+
+
+class Command(BaseCommand):
+    help = 'Заполняет search_vector для всех вакансий (после добавления поля или смены словарей)'
+
+    def handle(self, *args, **options):
+        count = Vacancy.objects.update(search_vector=Vacancy.get_search_vector())
+        self.stdout.write(self.style.SUCCESS(f'Обновлено вакансий: {count}'))
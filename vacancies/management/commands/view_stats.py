@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from vacancies.models import Vacancy
+from views.counters import view_counter
+
+
+class Command(BaseCommand):
+    help = 'Сколько просмотров вакансий записано и сколько схлопнуто окном дедупликации'
+
+    def handle(self, *args, **options):
+        stats = view_counter.get_dedup_stats(Vacancy)
+        total = stats['registered'] + stats['collapsed']
+        share = stats['collapsed'] / total * 100 if total else 0
+        self.stdout.write(
+            f"Записано: {stats['registered']}, схлопнуто: {stats['collapsed']} ({share:.1f}%)"
+        )
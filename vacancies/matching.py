@@ -0,0 +1,271 @@
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Value, FloatField, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from users.models import User
+from vacancies.models import Vacancy, VacancyMatchScore, VacancyResponse
+
+SKILLS_WEIGHT = 60
+SPECIALIZATION_WEIGHT = 30
+EXPERIENCE_WEIGHT = 10
+
+BATCH_SIZE = 1000
+
+UserProfile = namedtuple('UserProfile', ['id', 'skill_ids', 'specialization_id', 'experience_level'])
+VacancyProfile = namedtuple('VacancyProfile', ['id', 'skill_ids', 'specialization_ids', 'experience', 'job_format'])
+
+
+def calculate_match_score(user, vacancy):
+    """
+    Оценка соответствия пользователя вакансии от 0 до 100:
+    доля навыков вакансии, которые есть у пользователя (SKILLS_WEIGHT),
+    совпадение специализации (SPECIALIZATION_WEIGHT) и уровня опыта (EXPERIENCE_WEIGHT).
+
+    Опыт учитывается только при совпадении навыков или специализации,
+    поэтому ненулевые оценки есть лишь у "релевантных" пар и таблица остается разреженной.
+    """
+    score = 0
+    if vacancy.skill_ids:
+        score += SKILLS_WEIGHT * len(user.skill_ids & vacancy.skill_ids) / len(vacancy.skill_ids)
+    if user.specialization_id in vacancy.specialization_ids:
+        score += SPECIALIZATION_WEIGHT
+    if score and user.experience_level == vacancy.experience:
+        score += EXPERIENCE_WEIGHT
+    return round(score, 2)
+
+
+def load_user_profiles(users):
+    """
+    :param users: QuerySet пользователей
+    """
+    skills = defaultdict(set)
+    for user_id, skill_id in User.skills.through.objects.filter(user__in=users) \
+            .values_list('user_id', 'skill_id'):
+        skills[user_id].add(skill_id)
+
+    return [
+        UserProfile(
+            id=user_id,
+            skill_ids=frozenset(skills[user_id]),
+            specialization_id=specialization_id,
+            experience_level=User(total_experience=total_experience).get_experience_level(),
+        )
+        for user_id, specialization_id, total_experience
+        in users.values_list('id', 'specialization_id', 'total_experience')
+    ]
+
+
+def load_vacancy_profiles(vacancies):
+    """
+    :param vacancies: QuerySet вакансий
+    """
+    skills = defaultdict(set)
+    for vacancy_id, skill_id in Vacancy.skills.through.objects.filter(vacancy__in=vacancies) \
+            .values_list('vacancy_id', 'skill_id'):
+        skills[vacancy_id].add(skill_id)
+
+    specializations = defaultdict(set)
+    for vacancy_id, specialization_id in Vacancy.specializations.through.objects.filter(vacancy__in=vacancies) \
+            .values_list('vacancy_id', 'specialization_id'):
+        specializations[vacancy_id].add(specialization_id)
+
+    return [
+        VacancyProfile(
+            id=vacancy_id,
+            skill_ids=frozenset(skills[vacancy_id]),
+            specialization_ids=frozenset(specializations[vacancy_id]),
+            experience=experience,
+            job_format=job_format,
+        )
+        for vacancy_id, experience, job_format in vacancies.values_list('id', 'experience', 'job_format')
+    ]
+
+
+def get_scored_vacancies():
+    """
+    Вакансии, для которых поддерживаются оценки (прошедшие модерацию).
+    """
+    return Vacancy.objects.filter(approval_status='accepted')
+
+
+def calculate_user_scores(user_profile, vacancy_profiles):
+    return {
+        vacancy.id: score
+        for vacancy in vacancy_profiles
+        if (score := calculate_match_score(user_profile, vacancy))
+    }
+
+
+def calculate_response_score(user_id, vacancy_id):
+    """
+    Оценка кандидата по вакансии для нового отклика (считается для любой вакансии, не только принятой).
+    """
+    user_profiles = load_user_profiles(User.objects.filter(id=user_id))
+    vacancy_profiles = load_vacancy_profiles(Vacancy.objects.filter(id=vacancy_id))
+    if not user_profiles or not vacancy_profiles:
+        return 0
+    return calculate_match_score(user_profiles[0], vacancy_profiles[0])
+
+
+def refresh_response_scores(responses, user_profiles=None, vacancy_profiles=None):
+    """
+    Пересчитывает match_score откликов и сохраняет изменившиеся одним bulk_update.
+    """
+    responses = list(responses.only('id', 'user_id', 'vacancy_id', 'match_score'))
+    if not responses:
+        return
+
+    if user_profiles is None:
+        user_profiles = load_user_profiles(User.objects.filter(id__in={r.user_id for r in responses}))
+    if vacancy_profiles is None:
+        vacancy_profiles = load_vacancy_profiles(Vacancy.objects.filter(id__in={r.vacancy_id for r in responses}))
+    users = {profile.id: profile for profile in user_profiles}
+    vacancies = {profile.id: profile for profile in vacancy_profiles}
+
+    changed = []
+    for response in responses:
+        user, vacancy = users.get(response.user_id), vacancies.get(response.vacancy_id)
+        score = calculate_match_score(user, vacancy) if user and vacancy else 0
+        if score != response.match_score:
+            response.match_score = score
+            changed.append(response)
+    VacancyResponse.objects.bulk_update(changed, ['match_score'], batch_size=BATCH_SIZE)
+
+
+def save_scores(scores):
+    """
+    Upsert оценок по (user, vacancy): задачи пересчета вакансии и пользователя пишут пересекающиеся
+    пары и могут работать одновременно. Все записанные строки получают свежий updated_at,
+    поэтому устаревшие пары затем удаляются по updated_at < начала пересчета.
+    """
+    VacancyMatchScore.objects.bulk_create(
+        scores,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['user', 'vacancy'],
+        update_fields=['score', 'updated_at'],
+    )
+
+
+def update_vacancy_scores(vacancy_id):
+    """
+    Пересчитывает оценки одной вакансии для всех релевантных пользователей.
+    Для непринятой вакансии оценки удаляются.
+    """
+    vacancy_profiles = load_vacancy_profiles(get_scored_vacancies().filter(id=vacancy_id))
+    if not vacancy_profiles:
+        VacancyMatchScore.objects.filter(vacancy_id=vacancy_id).delete()
+        return
+
+    vacancy = vacancy_profiles[0]
+    candidates = User.objects.filter(
+        Q(skills__in=vacancy.skill_ids) | Q(specialization_id__in=vacancy.specialization_ids)
+    ).distinct()
+
+    scores = [
+        VacancyMatchScore(user_id=user.id, vacancy_id=vacancy.id, score=score)
+        for user in load_user_profiles(candidates)
+        if (score := calculate_match_score(user, vacancy))
+    ]
+
+    with transaction.atomic():
+        started = timezone.now()
+        save_scores(scores)
+        VacancyMatchScore.objects.filter(vacancy_id=vacancy_id, updated_at__lt=started).delete()
+
+    refresh_response_scores(VacancyResponse.objects.filter(vacancy_id=vacancy_id), vacancy_profiles=vacancy_profiles)
+
+
+def update_user_scores(user_id, vacancy_profiles=None, refresh_responses=True):
+    """
+    Пересчитывает оценки пользователя по всем принятым вакансиям и match_score его откликов.
+    """
+    user_profiles = load_user_profiles(User.objects.filter(id=user_id))
+    if not user_profiles:
+        return
+
+    if vacancy_profiles is None:
+        vacancy_profiles = load_vacancy_profiles(get_scored_vacancies())
+
+    scores = [
+        VacancyMatchScore(user_id=user_id, vacancy_id=vacancy_id, score=score)
+        for vacancy_id, score in calculate_user_scores(user_profiles[0], vacancy_profiles).items()
+    ]
+
+    with transaction.atomic():
+        started = timezone.now()
+        save_scores(scores)
+        VacancyMatchScore.objects.filter(user_id=user_id, updated_at__lt=started).delete()
+
+    if refresh_responses:
+        refresh_response_scores(VacancyResponse.objects.filter(user_id=user_id), user_profiles=user_profiles)
+
+
+def refresh_all_response_scores():
+    """
+    Пересчитывает match_score всех откликов пачками по id (в том числе на непринятые вакансии).
+    """
+    last_id = 0
+    while True:
+        response_ids = list(
+            VacancyResponse.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:BATCH_SIZE]
+        )
+        if not response_ids:
+            break
+        refresh_response_scores(VacancyResponse.objects.filter(id__in=response_ids))
+        last_id = response_ids[-1]
+
+
+def rebuild_match_scores():
+    """
+    Полностью пересобирает таблицу оценок и match_score откликов.
+    Возвращает количество обработанных пользователей.
+    """
+    vacancy_profiles = load_vacancy_profiles(get_scored_vacancies())
+    VacancyMatchScore.objects.exclude(vacancy__approval_status='accepted').delete()
+
+    user_ids = User.objects.order_by('id').values_list('id', flat=True)
+    count = 0
+    for user_id in user_ids.iterator(chunk_size=BATCH_SIZE):
+        update_user_scores(user_id, vacancy_profiles, refresh_responses=False)
+        count += 1
+
+    refresh_all_response_scores()
+    return count
+
+
+def check_match_scores(user_ids=None):
+    """
+    Сверяет сохраненные оценки с рассчитанными заново.
+    Возвращает список расхождений (user_id, vacancy_id, сохраненная, актуальная).
+    """
+    users = User.objects.all()
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+
+    vacancy_profiles = load_vacancy_profiles(get_scored_vacancies())
+    mismatches = []
+    for user in load_user_profiles(users):
+        expected = calculate_user_scores(user, vacancy_profiles)
+        stored = dict(VacancyMatchScore.objects.filter(user_id=user.id).values_list('vacancy_id', 'score'))
+        for vacancy_id in expected.keys() | stored.keys():
+            if expected.get(vacancy_id) != stored.get(vacancy_id):
+                mismatches.append((user.id, vacancy_id, stored.get(vacancy_id), expected.get(vacancy_id)))
+    return mismatches
+
+
+def annotate_stored_match_score(queryset, user):
+    """
+    Аннотирует вакансии сохраненной оценкой для пользователя (0, если оценки нет).
+
+    Оценки присоединяются LEFT JOIN по (user, vacancy), а не подзапросом на каждую строку:
+    строки пользователя читаются по индексу match_score_user_top_idx одним проходом.
+    """
+    return queryset.annotate(
+        user_match_score=FilteredRelation('match_scores', condition=Q(match_scores__user_id=user.pk))
+    ).annotate(
+        match_score=Coalesce(F('user_match_score__score'), Value(0.0), output_field=FloatField())
+    )
@@ -1,24 +1,29 @@
 import json
 
 from django.contrib.contenttypes.fields import GenericRelation
-from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField, SearchVector
+from django.db import connection, models, transaction
 from django.utils.timezone import now
 
 from common.models import Specialization, Skill, LanguageProficiency
-from vacancies.tasks import redis_client
+from common.tracking import ChangeTrackingMixin
+from vacancies.tasks import VIEWS_STREAM_KEY
+from users.contacts import refresh_contacts
 from users.models import User
 from django.utils.translation import gettext_lazy as _
 
-from views.models import View
+from views.counters import view_counter
 
 
-class Vacancy(models.Model):
+class Vacancy(ChangeTrackingMixin, models.Model):
     APPROVAL_CHOICES = [('pending', _('Pending')),
                         ('accepted', _('Accepted')),
                         ('rejected', _('Rejected')),
                         ('blocked', _('Blocked'))]
 
+    tracked_fields = ('approval_status',)
+
     TYPE_CHOICES = [('full_time', _('Full Time')),
                     ('part_time', _('Part Time')),
                     ('freelance', _('Freelance'))]
@@ -62,43 +67,200 @@ class Vacancy(models.Model):
     currency = models.CharField(max_length=10, choices=CURRENCY_CHOICES)
     payment_format = models.CharField(max_length=50, choices=PAYMENT_FORMAT_CHOICES)
     experience = models.CharField(max_length=100, choices=EXPERIENCE_CHOICES)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Зарплата в USD в месяц, пересчитывается при сохранении и при смене курса (vacancies.salary)
+    salary_min_usd_monthly = models.IntegerField(null=True, blank=True, editable=False)
+    salary_max_usd_monthly = models.IntegerField(null=True, blank=True, editable=False)
+    # Увеличивается при любом изменении вакансии и ее связей, ключ кэша деталей и ETag
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    # Словари полнотекстового поиска, по одному на язык интерфейса (settings.LANGUAGES)
+    SEARCH_CONFIGS = ('russian', 'english')
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='vacancy_search_vector_idx'),
+            models.Index(fields=['salary_min_usd_monthly', 'id'], name='vacancy_salary_min_idx'),
+            models.Index(fields=['salary_max_usd_monthly', 'id'], name='vacancy_salary_max_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
-    def register_view(self, user):
-        """Записываем просмотр в Redis"""
-        view_data = json.dumps({
+    def save(self, *args, **kwargs):
+        from vacancies.salary import SALARY_SOURCE_FIELDS, SALARY_FIELDS, calculate_normalized_salary
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or SALARY_SOURCE_FIELDS & set(update_fields):
+            self.salary_min_usd_monthly, self.salary_max_usd_monthly = calculate_normalized_salary(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | SALARY_FIELDS
+
+        bump_version = not self._state.adding
+        if bump_version:
+            # Инкремент в БД: значение в памяти могло устареть после bump_versions или чужого save()
+            self.version = models.F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'version'}
+        super().save(*args, **kwargs)
+        if bump_version:
+            self.refresh_from_db(fields=['version'])
+
+    def get_etag(self):
+        return f'"{self.pk}-{self.version}"'
+
+    @classmethod
+    def bump_versions(cls, vacancy_ids):
+        """
+        Увеличивает version вакансий, изменившихся без save() (M2M, языки).
+        """
+        cls.objects.filter(pk__in=vacancy_ids).update(version=models.F('version') + 1)
+
+    @classmethod
+    def get_search_vector(cls):
+        """
+        tsvector по title (вес A), company_name (B) и description (C) во всех SEARCH_CONFIGS.
+        """
+        vector = None
+        for config in cls.SEARCH_CONFIGS:
+            for field, weight in (('title', 'A'), ('company_name', 'B'), ('description', 'C')):
+                part = SearchVector(field, weight=weight, config=config)
+                vector = part if vector is None else vector + part
+        return vector
+
+    def update_search_vector(self):
+        Vacancy.objects.filter(pk=self.pk).update(search_vector=self.get_search_vector())
+
+    def make_view_data(self, user):
+        return json.dumps({
             "user_id": user.id,
             "vacancy_id": self.id,
             "timestamp": now().isoformat()
         })
-        redis_client.rpush("pending_vacancy_views", view_data)
+
+    def register_view(self, user):
+        """
+        Записываем просмотр в Redis и возвращаем (просмотры, уникальные зрители) за один запрос.
+        """
+        return view_counter.register(self, user, VIEWS_STREAM_KEY, self.make_view_data(user))
+
+    async def aregister_view(self, user):
+        return await view_counter.aregister(self, user, VIEWS_STREAM_KEY, self.make_view_data(user))
 
     def get_views_count(self):
-        """Получаем количество просмотров вакансии"""
-        content_type = ContentType.objects.get_for_model(Vacancy)
-        return View.objects.filter(object_id=self.id, content_type=content_type).count()
+        """Получаем количество просмотров вакансии из счетчика в Redis"""
+        return view_counter.get_counts(self)[0]
+
+    async def aget_views_count(self):
+        return (await view_counter.aget_counts(self))[0]
+
+
+class ExchangeRate(models.Model):
+    """
+    Локальная таблица курсов валют для нормализации зарплат.
+    Обновляется администраторами или периодической задачей update_exchange_rates.
+    """
+    currency = models.CharField(max_length=10, choices=Vacancy.CURRENCY_CHOICES, unique=True)
+    usd_rate = models.DecimalField(max_digits=20, decimal_places=10,
+                                   help_text=_('Стоимость единицы валюты в USD'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.currency}: {self.usd_rate} USD"
 
 
-class VacancyResponse(models.Model):
+class VacancyResponse(ChangeTrackingMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', _('Pending')),
         ('approved', _('Approved')),
         ('rejected', _('Rejected'))
     ]
 
+    tracked_fields = ('status',)
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='vacancy_responses')
     vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name='responses')
     message = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=50, choices=STATUS_CHOICES, default='pending')
     is_viewed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Оценка кандидата на момент отклика, обновляется при изменении профиля (vacancies.matching)
+    match_score = models.FloatField(default=0)
 
     def __str__(self):
         return f"{self.user.username} -> {self.vacancy.title}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            from vacancies.matching import calculate_response_score
+
+            self.match_score = calculate_response_score(self.user_id, self.vacancy_id)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def bulk_set_status(cls, response_ids, status, creator_id):
+        """
+        Меняет статус откликов на вакансии создателя одним UPDATE ... RETURNING
+        и обновляет ApprovedContact затронутых кандидатов (сигналы save при этом не отправляются).
+        Отклики, уже имеющие этот статус, не затрагиваются.
+        Возвращает список (id, user_id, vacancy_id) измененных откликов.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {cls._meta.db_table} AS r SET status = %s "
+                f"FROM {Vacancy._meta.db_table} AS v "
+                f"WHERE r.vacancy_id = v.id AND v.creator_id = %s AND r.id = ANY(%s) AND r.status <> %s "
+                f"RETURNING r.id, r.user_id, r.vacancy_id",
+                [status, creator_id, list(response_ids), status]
+            )
+            changed = cursor.fetchall()
+            refresh_contacts({(creator_id, user_id) for _, user_id, _ in changed})
+        return changed
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['user', 'vacancy'], name='unique_vacancy_response')
         ]
+        indexes = [
+            models.Index(fields=['vacancy', 'status', 'is_viewed', '-match_score', '-id'],
+                         name='response_inbox_filter_idx'),
+            models.Index(fields=['vacancy', '-match_score', '-id'], name='response_inbox_idx'),
+        ]
+
+
+class VacancyMatchScore(models.Model):
+    """
+    Предрассчитанная оценка соответствия пользователя вакансии.
+    Хранятся только ненулевые оценки принятых вакансий, см. vacancies.matching.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='vacancy_match_scores')
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name='match_scores')
+    score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.vacancy_id}: {self.score}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'vacancy'], name='unique_vacancy_match_score')
+        ]
+        indexes = [
+            models.Index(fields=['user', '-score', '-vacancy'], name='match_score_user_top_idx')
+        ]
+
+
+class VacancyResponseDailyRollup(models.Model):
+    """
+    Количество откликов на вакансию по дню создания и текущему статусу.
+    Пересчитывается фоновой задачей для вакансий, у которых менялись отклики (vacancies.analytics).
+    """
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name='response_rollups')
+    day = models.DateField()
+    status = models.CharField(max_length=50, choices=VacancyResponse.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['vacancy', 'day', 'status'], name='unique_vacancy_response_rollup')
+        ]
@@ -0,0 +1,134 @@
+import json
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import F, Value, IntegerField, DecimalField, ExpressionWrapper
+from django.db.models.functions import Round
+from redis import RedisError
+
+from common.pagination import KeysetPagination
+from common.redis import redis_client
+from vacancies.matching import annotate_stored_match_score
+from vacancies.models import Vacancy, ExchangeRate
+
+RATES_CACHE_KEY = 'vacancies:exchange_rates'
+RATES_CACHE_TTL = 60 * 60
+
+# Множитель для приведения суммы к месяцу. Разовая оплата (fixed) не сравнима с месячной
+MONTHLY_FACTORS = {
+    'hourly': Decimal(160),
+    'monthly': Decimal(1),
+    'yearly': Decimal(1) / Decimal(12),
+    'fixed': None,
+}
+
+SALARY_SOURCE_FIELDS = {'min_payment', 'max_payment', 'currency', 'payment_format'}
+SALARY_FIELDS = {'salary_min_usd_monthly', 'salary_max_usd_monthly'}
+
+
+def get_usd_rates():
+    """
+    Курсы валют в USD из Redis (при промахе — из таблицы ExchangeRate). USD всегда равен 1.
+    """
+    try:
+        cached = redis_client.get(RATES_CACHE_KEY)
+    except RedisError:
+        cached = None
+
+    if cached is not None:
+        rates = json.loads(cached)
+    else:
+        rates = {currency: str(rate) for currency, rate in ExchangeRate.objects.values_list('currency', 'usd_rate')}
+        try:
+            redis_client.set(RATES_CACHE_KEY, json.dumps(rates), ex=RATES_CACHE_TTL)
+        except RedisError:
+            pass
+
+    rates = {currency: Decimal(rate) for currency, rate in rates.items()}
+    rates['USD'] = Decimal(1)
+    return rates
+
+
+def get_salary_multiplier(currency, payment_format, rates):
+    """
+    Множитель суммы в валюте/формате оплаты к USD в месяц или None, если привести нельзя.
+    """
+    factor = MONTHLY_FACTORS.get(payment_format)
+    rate = rates.get(currency)
+    if factor is None or rate is None:
+        return None
+    return factor * rate
+
+
+def normalize_amount(amount, multiplier):
+    if amount is None or multiplier is None:
+        return None
+    return int((Decimal(amount) * multiplier).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def calculate_normalized_salary(vacancy, rates=None):
+    """
+    Возвращает (min, max) зарплаты вакансии в USD в месяц.
+    """
+    multiplier = get_salary_multiplier(vacancy.currency, vacancy.payment_format, rates or get_usd_rates())
+    return normalize_amount(vacancy.min_payment, multiplier), normalize_amount(vacancy.max_payment, multiplier)
+
+
+def recompute_salaries(currency=None):
+    """
+    Пересчитывает нормализованные зарплаты одним UPDATE на пару (валюта, формат оплаты).
+    Возвращает количество обновленных вакансий.
+    """
+    rates = get_usd_rates()
+    currencies = [currency] if currency else [value for value, _ in Vacancy.CURRENCY_CHOICES]
+
+    count = 0
+    for currency_value in currencies:
+        for payment_format in MONTHLY_FACTORS:
+            multiplier = get_salary_multiplier(currency_value, payment_format, rates)
+            count += Vacancy.objects.filter(currency=currency_value, payment_format=payment_format).update(
+                salary_min_usd_monthly=normalized_expression('min_payment', multiplier),
+                salary_max_usd_monthly=normalized_expression('max_payment', multiplier),
+            )
+    return count
+
+
+def normalized_expression(field, multiplier):
+    if multiplier is None:
+        return Value(None, output_field=IntegerField())
+    amount = ExpressionWrapper(
+        F(field) * Value(multiplier, output_field=DecimalField()),
+        output_field=DecimalField()
+    )
+    return Round(amount, output_field=IntegerField())
+
+
+def filter_by_salary(queryset, params):
+    """
+    Фильтры ленты salary_from/salary_to (USD в месяц) по нормализованным колонкам.
+    """
+    salary_from = params.get('salary_from')
+    if salary_from and salary_from.isdigit():
+        queryset = queryset.filter(salary_max_usd_monthly__gte=int(salary_from))
+
+    salary_to = params.get('salary_to')
+    if salary_to and salary_to.isdigit():
+        queryset = queryset.filter(salary_min_usd_monthly__lte=int(salary_to))
+    return queryset
+
+
+class SalaryPagination(KeysetPagination):
+    ordering = ('-salary_max_usd_monthly', '-id')
+
+
+def order_by_salary(queryset, user):
+    """
+    Лента, отсортированная по верхней границе зарплаты (вакансии без зарплаты исключаются).
+    """
+    return annotate_stored_match_score(queryset.filter(salary_max_usd_monthly__isnull=False), user)
+
+
+def reset_rates_cache():
+    try:
+        redis_client.delete(RATES_CACHE_KEY)
+    except RedisError:
+        pass
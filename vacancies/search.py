@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField, ExpressionWrapper
+
+from common.pagination import KeysetPagination
+from vacancies.matching import annotate_stored_match_score
+from vacancies.models import Vacancy
+
+# Насколько match_score (0..100) может поднять ts_rank: rank * (1 + MATCH_SCORE_BOOST * match_score / 100)
+MATCH_SCORE_BOOST = 1.0
+
+
+class SearchPagination(KeysetPagination):
+    ordering = ('-search_rank', '-id')
+
+
+def get_search_query(text):
+    """
+    Объединение запросов во всех словарях Vacancy.SEARCH_CONFIGS (websearch-синтаксис).
+    """
+    query = None
+    for config in Vacancy.SEARCH_CONFIGS:
+        part = SearchQuery(text, config=config, search_type='websearch')
+        query = part if query is None else query | part
+    return query
+
+
+def search_vacancies(queryset, text, user):
+    """
+    Фильтрует вакансии по полнотекстовому запросу (GIN-индекс по search_vector)
+    и аннотирует search_rank: ts_rank, усиленный match_score пользователя.
+
+    Сначала по ts_rank отбираются SEARCH_CANDIDATES_LIMIT лучших совпадений,
+    и только они переранжируются с учетом match_score (присоединение оценок — на ограниченном наборе).
+    """
+    query = get_search_query(text)
+    candidates = queryset.filter(search_vector=query) \
+        .annotate(text_rank=SearchRank(F('search_vector'), query)) \
+        .order_by('-text_rank', '-id') \
+        .values('id')[:settings.SEARCH_CANDIDATES_LIMIT]
+
+    queryset = annotate_stored_match_score(queryset.filter(id__in=candidates), user)
+    return queryset.annotate(
+        search_rank=ExpressionWrapper(
+            SearchRank(F('search_vector'), query) * (1 + MATCH_SCORE_BOOST * F('match_score') / 100.0),
+            output_field=FloatField()
+        )
+    )
@@ -1,5 +1,6 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from common.models import Specialization, Skill, Language
+from common.models import Specialization, Skill, Language, LanguageProficiency
 from vacancies.models import Vacancy, VacancyResponse
 
 
@@ -107,19 +108,26 @@ class VacancyListSerializer(serializers.ModelSerializer):
         ]
 
 
-class VacancySerializer(VacancyMainSerializer):
-    specializations = serializers.SerializerMethodField(read_only=True)
-    skills = serializers.SerializerMethodField(read_only=True)
-    languages = serializers.SerializerMethodField(read_only=True)
+class VacancyRelationsMixin:
+    """
+    Вложенные skills/specializations/languages вакансии и план их предзагрузки.
+    Вьюсеты применяют setup_eager_loading к queryset автоматически (см. EagerLoadingMixin),
+    поэтому количество запросов на страницу не зависит от ее размера.
+    """
 
-    class Meta(VacancyMainSerializer.Meta):
-        fields = '__all__'
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.prefetch_related(
+            Prefetch('languages', queryset=LanguageProficiency.objects.select_related('language')),
+            'skills',
+            'specializations',
+        )
 
     def get_specializations(self, obj):
         return [
             {
                 'id': spec.id,
-                'name': spec.name,  # пример
+                'name': spec.name,
             }
             for spec in obj.specializations.all()
         ]
@@ -144,7 +152,16 @@ class VacancySerializer(VacancyMainSerializer):
         ]
 
 
-class VacancyFeedSerializer(VacancyMainSerializer):
+class VacancySerializer(VacancyRelationsMixin, VacancyMainSerializer):
+    specializations = serializers.SerializerMethodField(read_only=True)
+    skills = serializers.SerializerMethodField(read_only=True)
+    languages = serializers.SerializerMethodField(read_only=True)
+
+    class Meta(VacancyMainSerializer.Meta):
+        fields = '__all__'
+
+
+class VacancyFeedSerializer(VacancyRelationsMixin, VacancyMainSerializer):
     match_score = serializers.SerializerMethodField()
     specializations = serializers.SerializerMethodField(read_only=True)
     skills = serializers.SerializerMethodField(read_only=True)
@@ -174,34 +191,6 @@ class VacancyFeedSerializer(VacancyMainSerializer):
         """
         return getattr(obj, 'match_score', None)
 
-    def get_specializations(self, obj):
-        return [
-            {
-                'id': spec.id,
-                'name': spec.name,
-            }
-            for spec in obj.specializations.all()
-        ]
-
-    def get_skills(self, obj):
-        return [
-            {
-                'id': skill.id,
-                'name': skill.name,
-            }
-            for skill in obj.skills.all()
-        ]
-
-    def get_languages(self, obj):
-        return [
-            {
-                'id': lang.id,
-                'language': lang.language.name,
-                'level': lang.level,
-            }
-            for lang in obj.languages.all()
-        ]
-
 
 class VacancyResponseSerializer(serializers.ModelSerializer):
     class Meta:
@@ -230,6 +219,15 @@ class VacancyResponseStatusUpdateSerializer(serializers.ModelSerializer):
         fields = ('status', 'custom_message')
 
 
+class VacancyResponseBulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+    status = serializers.ChoiceField(choices=VacancyResponse.STATUS_CHOICES)
+    custom_message = serializers.CharField(
+        required=False,
+        help_text="Сообщение, которое будет отправлено кандидатам вместе с уведомлением."
+    )
+
+
 class VacancyApprovalSerializer(serializers.ModelSerializer):
     custom_message = serializers.CharField(
         write_only=True,
@@ -0,0 +1,148 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from common.models import LanguageProficiency
+from users.contacts import refresh_contacts
+from users.models import User
+from vacancies.analytics import mark_responses_changed
+from vacancies.cache import feed_cache
+from vacancies.index import mark_vacancy_changed
+from vacancies.models import Vacancy, ExchangeRate, VacancyResponse
+from vacancies.salary import reset_rates_cache
+from vacancies.tasks import update_vacancy_match_scores, update_user_match_scores, recompute_vacancy_salaries
+
+# Поля пользователя, от которых зависит оценка соответствия
+USER_MATCH_FIELDS = {'specialization', 'specialization_id', 'total_experience'}
+
+# Поля вакансии, из которых строится search_vector
+VACANCY_SEARCH_FIELDS = {'title', 'company_name', 'description'}
+
+
+@receiver(post_save, sender=Vacancy)
+def update_vacancy_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Пересчитывает search_vector вакансии в той же транзакции, что и сохранение.
+    """
+    if update_fields is not None and not VACANCY_SEARCH_FIELDS & set(update_fields):
+        return
+    instance.update_search_vector()
+
+
+@receiver(post_save, sender=Vacancy)
+def vacancy_saved(sender, instance, created, **kwargs):
+    """
+    Пересчитывает оценки вакансии (при approval_status != 'accepted' они удаляются),
+    помечает ее для обновления в индексах вакансий и сбрасывает кэш ленты.
+    """
+    if created and instance.approval_status != 'accepted':
+        return
+
+    vacancy_id = instance.pk
+    transaction.on_commit(lambda: update_vacancy_match_scores.delay(vacancy_id))
+    transaction.on_commit(lambda: mark_vacancy_changed(vacancy_id))
+    transaction.on_commit(feed_cache.bump_global)
+
+
+@receiver(post_delete, sender=Vacancy)
+def vacancy_deleted(sender, instance, **kwargs):
+    """
+    Убирает удаленную вакансию из индексов вакансий и сбрасывает кэш ленты.
+    """
+    vacancy_id = instance.pk
+    transaction.on_commit(lambda: mark_vacancy_changed(vacancy_id))
+    transaction.on_commit(feed_cache.bump_global)
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+@receiver(m2m_changed, sender=Vacancy.specializations.through)
+def vacancy_requirements_changed(sender, instance, action, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear') or not isinstance(instance, Vacancy):
+        return
+
+    Vacancy.bump_versions([instance.pk])
+    instance.refresh_from_db(fields=['version'])
+
+    vacancy_id = instance.pk
+    transaction.on_commit(lambda: update_vacancy_match_scores.delay(vacancy_id))
+    transaction.on_commit(lambda: mark_vacancy_changed(vacancy_id))
+    transaction.on_commit(feed_cache.bump_global)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Пересчитывает оценки пользователя и сбрасывает его кэш ленты
+    при изменении специализации или опыта.
+    """
+    if created or (update_fields is not None and not USER_MATCH_FIELDS & set(update_fields)):
+        return
+
+    user_id = instance.pk
+    transaction.on_commit(lambda: update_user_match_scores.delay(user_id))
+    transaction.on_commit(lambda: feed_cache.bump_user(user_id))
+
+
+@receiver(m2m_changed, sender=User.skills.through)
+def user_skills_changed(sender, instance, action, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear') or not isinstance(instance, User):
+        return
+
+    user_id = instance.pk
+    transaction.on_commit(lambda: update_user_match_scores.delay(user_id))
+    transaction.on_commit(lambda: feed_cache.bump_user(user_id))
+
+
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def exchange_rate_changed(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш курсов и пересчитывает зарплаты вакансий в этой валюте.
+    """
+    currency = instance.currency
+    transaction.on_commit(reset_rates_cache)
+    transaction.on_commit(lambda: recompute_vacancy_salaries.delay(currency))
+
+
+@receiver(post_save, sender=VacancyResponse)
+@receiver(post_delete, sender=VacancyResponse)
+def vacancy_response_changed(sender, instance, created=False, **kwargs):
+    """
+    Помечает вакансию для пересчета агрегатов откликов (аналитика для создателя).
+    Сохранения без смены статуса агрегаты не меняют и пропускаются.
+    """
+    if kwargs['signal'] is post_save and not created and instance.is_tracked('status') \
+            and 'status' not in instance.get_changes():
+        return
+
+    vacancy_id = instance.vacancy_id
+    transaction.on_commit(lambda: mark_responses_changed(vacancy_id))
+
+
+@receiver(post_save, sender=VacancyResponse)
+@receiver(post_delete, sender=VacancyResponse)
+def update_approved_contacts(sender, instance, created=False, **kwargs):
+    """
+    Обновляет ApprovedContact пары создатель — кандидат в той же транзакции,
+    если отклик одобрен, перестал быть одобренным или удален.
+    """
+    if kwargs['signal'] is post_save:
+        if instance.is_tracked('status'):
+            if 'approved' not in instance.get_changes().get('status', ()):
+                return
+        elif created and instance.status != 'approved':
+            return
+    elif instance.status != 'approved':
+        return
+    refresh_contacts([(instance.vacancy.creator_id, instance.user_id)])
+
+
+@receiver(post_save, sender=LanguageProficiency)
+@receiver(post_delete, sender=LanguageProficiency)
+def vacancy_language_changed(sender, instance, **kwargs):
+    """
+    Языки вакансии входят в кэш деталей, поэтому их изменение увеличивает version вакансии.
+    """
+    if instance.content_type_id == ContentType.objects.get_for_model(Vacancy).id:
+        Vacancy.bump_versions([instance.object_id])
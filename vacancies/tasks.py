@@ -1,41 +1,264 @@
 import json
+import os
+import socket
+from decimal import Decimal
 
-import redis
+import requests
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from redis import ResponseError
 
+from common.redis import redis_client
 from core.celery import celery_app as app
+from views.counters import TOTAL_KEY
 from views.models import View
 
-redis_client = redis.StrictRedis(host='localhost', port=6379, db=0)
+
+PENDING_VIEWS_KEY = "pending_vacancy_views"
+VIEWS_STREAM_KEY = "vacancy_views"
+VIEWS_STREAM_GROUP = "views_flush"
 
 
 @app.task
 def flush_views_to_db():
-    """Сбрасываем накопленные просмотры из Redis в БД"""
+    """Сбрасываем счетчики просмотров в БД и запускаем потребителей потока просмотров"""
+    from events.models import Event
+
+    flush_view_counters()
+    flush_view_counters(Event)
+    flush_pending_views()
+    cleanup_view_consumers()
+
+    for _ in range(settings.VIEWS_STREAM_CONSUMERS):
+        consume_views.delay()
+
+
+@app.task
+def consume_views():
+    """Записываем просмотры из Redis Stream в БД как один из потребителей группы"""
+    return consume_view_stream(get_consumer_name())
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def flush_view_counters(model=None, batch_size=None):
+    """
+    Переносит счетчики <модель>:<id>:views в views_count модели (по умолчанию Vacancy):
+    ключи перебираются через SCAN, значения читаются MGET и пишутся
+    одним UPDATE ... FROM (VALUES ...) на пачку. Возвращает число прочитанных счетчиков.
+    """
     from vacancies.models import Vacancy
 
-    views = []
-    content_type = ContentType.objects.get_for_model(Vacancy)
+    model = model or Vacancy
+    batch_size = batch_size or settings.VIEWS_FLUSH_BATCH_SIZE
+    table = model._meta.db_table
+    count = 0
+
+    keys = redis_client.scan_iter(match=TOTAL_KEY.format(model._meta.model_name, '*'), count=batch_size)
+    for chunk in chunked(keys, batch_size):
+        values = redis_client.mget(chunk)
+        rows = [
+            (int(key.decode().split(":")[1]), int(value))
+            for key, value in zip(chunk, values)
+            if value is not None
+        ]
+        if not rows:
+            continue
+
+        placeholders = ", ".join(["(%s, %s)"] * len(rows))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} AS v SET views_count = c.views_count "
+                f"FROM (VALUES {placeholders}) AS c(id, views_count) "
+                f"WHERE v.id = c.id AND v.views_count <> c.views_count",
+                [value for row in rows for value in row]
+            )
+        count += len(rows)
+    return count
+
+
+def flush_pending_views(key=PENDING_VIEWS_KEY, batch_size=None):
+    """
+    Дочитывает старый список просмотров (до перехода на поток): пачками LRANGE + LTRIM в MULTI
+    и bulk_create того же размера. Возвращает число записанных просмотров.
+    """
+    batch_size = batch_size or settings.VIEWS_FLUSH_BATCH_SIZE
+    count = 0
+
+    while True:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.lrange(key, 0, batch_size - 1)
+        pipe.ltrim(key, batch_size, -1)
+        items, _ = pipe.execute()
+        if not items:
+            break
+
+        View.objects.bulk_create([make_view(item) for item in items], batch_size=batch_size)
+        count += len(items)
+
+        if len(items) < batch_size:
+            break
+    return count
+
+
+def make_view(data):
+    from vacancies.models import Vacancy
+
+    view_data = json.loads(data)
+    # Просмотры вакансий пишутся в старом формате (vacancy_id), остальных объектов — с content_type
+    if "vacancy_id" in view_data:
+        content_type = ContentType.objects.get_for_model(Vacancy)
+        object_id = view_data["vacancy_id"]
+    else:
+        content_type = ContentType.objects.get_by_natural_key(*view_data["content_type"].split("."))
+        object_id = view_data["object_id"]
+    return View(
+        user_id=view_data["user_id"],
+        content_type=content_type,
+        object_id=object_id,
+        timestamp=view_data["timestamp"]
+    )
+
+
+def get_consumer_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def ensure_views_group(stream=VIEWS_STREAM_KEY, group=VIEWS_STREAM_GROUP):
+    try:
+        redis_client.xgroup_create(stream, group, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def consume_view_stream(consumer, stream=VIEWS_STREAM_KEY, group=VIEWS_STREAM_GROUP, batch_size=None):
+    """
+    Читает поток просмотров в группе потребителей и пишет их в БД пачками.
 
-    keys = redis_client.keys("vacancy:*:views")
+    Сначала через XAUTOCLAIM забираются записи, которые другие потребители прочитали,
+    но не подтвердили дольше VIEWS_STREAM_CLAIM_IDLE мс (упавший воркер), затем новые записи.
+    Записи подтверждаются (XACK) и удаляются из потока только после коммита в БД,
+    поэтому при падении они будут записаны повторно, а не потеряны.
+    Возвращает число записанных просмотров.
+    """
+    batch_size = batch_size or settings.VIEWS_FLUSH_BATCH_SIZE
+    ensure_views_group(stream, group)
+    count = 0
 
-    for key in keys:
-        key_str = key.decode()
-        vacancy_id = int(key_str.split(":")[1])
-        redis_views = int(redis_client.get(key) or 0)
+    start_id = "0-0"
+    while True:
+        start_id, entries, *_ = redis_client.xautoclaim(
+            stream, group, consumer, settings.VIEWS_STREAM_CLAIM_IDLE, start_id=start_id, count=batch_size
+        )
+        count += save_view_entries(entries, stream, group, batch_size)
+        if start_id in (b"0-0", "0-0"):
+            break
 
-        Vacancy.objects.filter(id=vacancy_id).update(views_count=redis_views)
+    while True:
+        response = redis_client.xreadgroup(group, consumer, {stream: ">"}, count=batch_size)
+        if not response:
+            break
+        entries = response[0][1]
+        count += save_view_entries(entries, stream, group, batch_size)
+        if len(entries) < batch_size:
+            break
+    return count
+
+
+def save_view_entries(entries, stream, group, batch_size):
+    if not entries:
+        return 0
+
+    ids = [entry_id for entry_id, _ in entries]
+    # Удаленные из потока записи XAUTOCLAIM может вернуть без полей
+    views = [make_view(fields[b"data"]) for _, fields in entries if fields]
+    with transaction.atomic():
+        View.objects.bulk_create(views, batch_size=batch_size)
+
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.xack(stream, group, *ids)
+    pipe.xdel(stream, *ids)
+    pipe.execute()
+    return len(views)
+
+
+def cleanup_view_consumers(stream=VIEWS_STREAM_KEY, group=VIEWS_STREAM_GROUP):
+    """
+    Удаляет из группы потребителей без неподтвержденных записей, которые давно не читали поток
+    (у каждого процесса воркера свое имя, поэтому после перезапусков они накапливаются).
+    """
+    try:
+        consumers = redis_client.xinfo_consumers(stream, group)
+    except ResponseError:
+        return
+
+    for consumer in consumers:
+        if consumer["pending"] == 0 and consumer["idle"] > settings.VIEWS_STREAM_CLAIM_IDLE:
+            redis_client.xgroup_delconsumer(stream, group, consumer["name"])
+
+
+@app.task
+def rollup_response_stats():
+    """Пересчитываем агрегаты откликов для вакансий, у которых они менялись"""
+    from vacancies.analytics import rollup_dirty_vacancies
+
+    rollup_dirty_vacancies()
+
+
+@app.task
+def update_vacancy_match_scores(vacancy_id):
+    """Пересчитываем оценки соответствия вакансии после ее изменения"""
+    from vacancies.matching import update_vacancy_scores
+
+    update_vacancy_scores(vacancy_id)
+
+
+@app.task
+def update_user_match_scores(user_id):
+    """Пересчитываем оценки соответствия пользователя после изменения профиля"""
+    from vacancies.matching import update_user_scores
+
+    update_user_scores(user_id)
+
+
+@app.task
+def recompute_vacancy_salaries(currency=None):
+    """Пересчитываем нормализованные зарплаты после изменения курса валюты"""
+    from vacancies.cache import feed_cache
+    from vacancies.salary import recompute_salaries
+
+    recompute_salaries(currency)
+    feed_cache.bump_global()
+
+
+@app.task
+def update_exchange_rates():
+    """Загружаем курсы валют (ответ вида {"rates": {"RUB": 92.5, ...}} относительно USD)"""
+    from vacancies.models import ExchangeRate, Vacancy
 
-    while redis_client.llen("pending_vacancy_views") > 0:
-        view_json = redis_client.lpop("pending_vacancy_views")
-        view_data = json.loads(view_json.decode())
+    if not settings.EXCHANGE_RATES_URL:
+        return
 
-        views.append(View(
-            user_id=view_data["user_id"],
-            content_type=content_type,
-            object_id=view_data["vacancy_id"],
-            timestamp=view_data["timestamp"]
-        ))
+    response = requests.get(settings.EXCHANGE_RATES_URL, timeout=10)
+    response.raise_for_status()
+    rates = response.json()['rates']
 
-    if views:
-        View.objects.bulk_create(views)
+    for currency, _ in Vacancy.CURRENCY_CHOICES:
+        if currency == 'USD' or not rates.get(currency):
+            continue
+        usd_rate = (Decimal(1) / Decimal(str(rates[currency]))).quantize(Decimal('1e-10'))
+        rate, created = ExchangeRate.objects.get_or_create(currency=currency, defaults={'usd_rate': usd_rate})
+        if not created and rate.usd_rate != usd_rate:
+            rate.usd_rate = usd_rate
+            rate.save()
@@ -0,0 +1,72 @@
+from datetime import date
+from unittest.mock import patch
+
+import fakeredis
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from users.models import User
+from vacancies.analytics import rollup_vacancy_responses, get_vacancy_analytics, get_response_summary, \
+    rollup_dirty_vacancies, DIRTY_KEY
+from vacancies.models import Vacancy, VacancyResponse
+from views.models import ViewDailyRollup
+
+
+class VacancyAnalyticsTest(TestCase):
+    def setUp(self):
+        self.creator = User.objects.create(first_name='John', username='johndoe')
+        self.parent = Vacancy.objects.create(title='Freelance project', creator=self.creator, type='freelance')
+        self.child = Vacancy.objects.create(title='Designer', creator=self.creator, type='freelance',
+                                            parent_vacancy=self.parent)
+
+        for i in range(3):
+            candidate = User.objects.create(first_name=f'Candidate {i}', username=f'candidate{i}')
+            vacancy = self.parent if i == 0 else self.child
+            VacancyResponse.objects.create(user=candidate, vacancy=vacancy,
+                                           status='approved' if i == 2 else 'pending')
+
+        content_type = ContentType.objects.get_for_model(Vacancy)
+        for vacancy in (self.parent, self.child):
+            ViewDailyRollup.objects.create(content_type=content_type, object_id=vacancy.id, day=date.today(),
+                                           views=10, unique_viewers=5)
+
+    def test_failed_rollup_keeps_vacancies_marked(self):
+        redis = fakeredis.FakeStrictRedis()
+        redis.sadd(DIRTY_KEY, self.parent.id)
+
+        with patch('vacancies.analytics.redis_client', redis), \
+                patch('vacancies.analytics.rollup_vacancy_responses', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                rollup_dirty_vacancies()
+
+        self.assertEqual(redis.smembers(DIRTY_KEY), {str(self.parent.id).encode()})
+
+    def test_parent_aggregates_children(self):
+        rollup_vacancy_responses([self.parent.id, self.child.id])
+
+        with self.assertNumQueries(2):
+            analytics = get_vacancy_analytics(self.parent)
+
+        self.assertEqual(analytics['total_views'], 20)
+        self.assertEqual(analytics['total_responses'], 3)
+        self.assertEqual(analytics['conversion'], 0.15)
+        self.assertEqual(analytics['status_funnel'], {'pending': 2, 'approved': 1, 'rejected': 0})
+        self.assertEqual(analytics['responses_per_day'], [{'day': date.today(), 'responses': 3}])
+
+    def test_rollup_follows_status_changes(self):
+        rollup_vacancy_responses([self.child.id])
+        VacancyResponse.objects.filter(vacancy=self.child).update(status='rejected')
+        rollup_vacancy_responses([self.child.id])
+
+        analytics = get_vacancy_analytics(self.child)
+        self.assertEqual(analytics['status_funnel'], {'pending': 0, 'approved': 0, 'rejected': 2})
+
+    def test_response_summary_in_single_query(self):
+        with self.assertNumQueries(1):
+            summary = get_response_summary(self.parent)
+
+        self.assertEqual(summary['vacancy_ids'], [self.parent.id, self.child.id])
+        self.assertEqual(summary['counts'], {'total': 3, 'new': 3, 'pending': 2, 'approved': 1, 'rejected': 0})
+        self.assertEqual(len(summary['children']), 1)
+        self.assertEqual(summary['children'][0]['id'], self.child.id)
+        self.assertEqual(summary['children'][0]['total'], 2)
@@ -0,0 +1,86 @@
+from unittest.mock import patch, Mock, AsyncMock
+
+from django.http import QueryDict
+from django.test import TestCase
+
+from vacancies.cache import feed_cache, facets_cache, normalize_params
+
+
+@patch('vacancies.cache.redis_client')
+class FeedCacheTest(TestCase):
+    def test_params_order_does_not_change_key(self, redis_mock):
+        self.assertEqual(
+            normalize_params(QueryDict('type=full_time&job_format=remote&cursor=abc')),
+            normalize_params(QueryDict('cursor=abc&job_format=remote&type=full_time')),
+        )
+        self.assertNotEqual(
+            normalize_params(QueryDict('type=full_time')),
+            normalize_params(QueryDict('type=part_time')),
+        )
+
+    def test_version_bump_changes_key(self, redis_mock):
+        params = QueryDict('type=full_time')
+        redis_mock.mget.return_value = [b'1', None]
+        old_key = feed_cache.make_key(1, params)
+
+        redis_mock.mget.return_value = [b'2', None]
+        self.assertNotEqual(feed_cache.make_key(1, params), old_key)
+
+    def test_path_is_part_of_key(self, redis_mock):
+        params = QueryDict('type=full_time')
+        redis_mock.mget.return_value = [None, None]
+        self.assertNotEqual(
+            feed_cache.make_key(1, params, '/api/vacancies/feed/'),
+            feed_cache.make_key(1, params, '/api/async/vacancies/feed/')
+        )
+
+    def test_hit_does_not_compute(self, redis_mock):
+        redis_mock.mget.return_value = [None, None]
+        redis_mock.get.return_value = b'{"next": null, "results": []}'
+        compute = Mock()
+
+        data = feed_cache.get_or_set(1, QueryDict(''), compute)
+
+        self.assertEqual(data, {'next': None, 'results': []})
+        compute.assert_not_called()
+
+    def test_miss_computes_once_and_stores(self, redis_mock):
+        redis_mock.mget.return_value = [None, None]
+        redis_mock.get.return_value = None
+        redis_mock.set.return_value = True
+        compute = Mock(return_value={'next': None, 'results': [{'id': 1}]})
+
+        data = feed_cache.get_or_set(1, QueryDict(''), compute)
+
+        self.assertEqual(data, {'next': None, 'results': [{'id': 1}]})
+        compute.assert_called_once()
+        redis_mock.eval.assert_called_once()
+
+    def test_facets_do_not_share_keys_with_pages(self, redis_mock):
+        params = QueryDict('type=full_time')
+        redis_mock.mget.return_value = [b'1', b'1']
+        self.assertNotEqual(facets_cache.make_key(1, params), feed_cache.make_key(1, params))
+
+
+@patch('vacancies.cache.async_redis_client')
+class AsyncFeedCacheTest(TestCase):
+    async def test_miss_computes_once_and_stores(self, redis_mock):
+        redis_mock.mget = AsyncMock(return_value=[None, None])
+        redis_mock.get = AsyncMock(return_value=None)
+        redis_mock.set = AsyncMock(return_value=True)
+        redis_mock.eval = AsyncMock()
+        compute = AsyncMock(return_value={'next': None, 'results': [{'id': 1}]})
+
+        data = await feed_cache.aget_or_set(1, QueryDict(''), compute)
+
+        self.assertEqual(data, {'next': None, 'results': [{'id': 1}]})
+        compute.assert_awaited_once()
+        redis_mock.eval.assert_awaited_once()
+
+    async def test_hit_does_not_compute(self, redis_mock):
+        redis_mock.mget = AsyncMock(return_value=[None, None])
+        redis_mock.get = AsyncMock(return_value=b'{"next": null, "results": []}')
+        compute = AsyncMock()
+
+        self.assertEqual(await feed_cache.aget_or_set(1, QueryDict(''), compute), {'next': None, 'results': []})
+        compute.assert_not_awaited()
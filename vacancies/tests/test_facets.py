@@ -0,0 +1,44 @@
+from django.http import QueryDict
+from django.test import TestCase
+
+from common.models import Specialization
+from users.models import User
+from vacancies.facets import get_facet_counts, get_facet_params
+from vacancies.models import Vacancy
+
+
+class FacetCountsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        self.backend = Specialization.objects.create(name='Backend Development')
+        self.design = Specialization.objects.create(name='Design')
+
+        first = Vacancy.objects.create(title='Backend Developer', creator=self.user, job_format='remote',
+                                       experience='junior', currency='USD')
+        first.specializations.add(self.backend, self.design)
+        second = Vacancy.objects.create(title='Python Developer', creator=self.user, job_format='remote',
+                                        experience='senior', currency='RUB')
+        second.specializations.add(self.backend)
+        Vacancy.objects.create(title='Designer', creator=self.user, job_format='onsite',
+                               experience='junior', currency='USD')
+
+    def test_counts_in_single_query(self):
+        with self.assertNumQueries(1):
+            facets = get_facet_counts(Vacancy.objects.all())
+
+        self.assertEqual(facets['job_format'], {'remote': 2, 'onsite': 1})
+        self.assertEqual(facets['experience'], {'junior': 2, 'senior': 1})
+        self.assertEqual(facets['currency'], {'USD': 2, 'RUB': 1})
+        self.assertEqual(facets['specializations'], [
+            {'id': self.backend.id, 'name': 'Backend Development', 'count': 2},
+            {'id': self.design.id, 'name': 'Design', 'count': 1},
+        ])
+
+    def test_counts_respect_filters(self):
+        facets = get_facet_counts(Vacancy.objects.filter(job_format='remote'))
+        self.assertEqual(facets['job_format'], {'remote': 2})
+        self.assertEqual(facets['currency'], {'USD': 1, 'RUB': 1})
+
+    def test_pagination_params_are_ignored(self):
+        params = get_facet_params(QueryDict('type=full_time&cursor=abc&page_size=10'))
+        self.assertEqual(params.dict(), {'type': 'full_time'})
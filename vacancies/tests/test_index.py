@@ -0,0 +1,97 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from common.models import Specialization, Skill
+from users.models import User
+from vacancies.index import VacancyIndex, vacancy_index, rank_vacancies
+from vacancies.matching import calculate_match_score, load_user_profiles, load_vacancy_profiles
+from vacancies.models import Vacancy
+
+
+@patch('vacancies.index.redis_client')
+class VacancyIndexTest(TestCase):
+    def setUp(self):
+        self.specialization = Specialization.objects.create(name='Backend Development')
+        self.python = Skill.objects.create(name='Python')
+        self.django = Skill.objects.create(name='Django')
+
+        self.user = User.objects.create(first_name='John', username='johndoe', specialization=self.specialization)
+        self.user.skills.add(self.python)
+        self.creator = User.objects.create(first_name='Jane', username='janedoe')
+
+        self.backend = self.create_vacancy('Backend Developer', [self.python, self.django], 'intern')
+        self.python_dev = self.create_vacancy('Python Developer', [self.python], 'senior')
+        self.designer = self.create_vacancy('Designer', [], 'intern')
+
+    def create_vacancy(self, title, skills, experience):
+        vacancy = Vacancy.objects.create(title=title, creator=self.creator, approval_status='accepted',
+                                         experience=experience, job_format='remote')
+        vacancy.skills.add(*skills)
+        if skills:
+            vacancy.specializations.add(self.specialization)
+        return vacancy
+
+    def test_scores_match_python_scorer(self, redis_mock):
+        redis_mock.get.return_value = None
+        index = VacancyIndex()
+        index.build()
+
+        user_profile = load_user_profiles(User.objects.filter(pk=self.user.pk))[0]
+        expected = {
+            vacancy.id: calculate_match_score(user_profile, vacancy)
+            for vacancy in load_vacancy_profiles(Vacancy.objects.all())
+        }
+        self.assertEqual(dict(index.top_k(user_profile, 10)), expected)
+
+    def test_top_k_order_and_cursor(self, redis_mock):
+        redis_mock.get.return_value = None
+        index = VacancyIndex()
+        index.build()
+        user_profile = load_user_profiles(User.objects.filter(pk=self.user.pk))[0]
+
+        first_page = index.top_k(user_profile, 2)
+        self.assertEqual([vacancy_id for vacancy_id, _ in first_page], [self.python_dev.id, self.backend.id])
+
+        second_page = index.top_k(user_profile, 2, after=first_page[-1])
+        self.assertEqual(second_page, [(self.designer.id, 0.0)])
+
+    def test_refresh_removes_rejected_vacancy(self, redis_mock):
+        redis_mock.get.return_value = None
+        index = VacancyIndex()
+        index.build()
+
+        Vacancy.objects.filter(id=self.backend.id).update(approval_status='blocked')
+        index.refresh([self.backend.id])
+
+        user_profile = load_user_profiles(User.objects.filter(pk=self.user.pk))[0]
+        self.assertNotIn(self.backend.id, dict(index.top_k(user_profile, 10)))
+        self.assertEqual(len(index), 2)
+
+    def test_refresh_does_not_change_taken_snapshot(self, redis_mock):
+        redis_mock.get.return_value = None
+        index = VacancyIndex()
+        index.build()
+        snapshot = index.snapshot()
+
+        Vacancy.objects.filter(id=self.backend.id).update(approval_status='blocked')
+        index.refresh([self.backend.id])
+
+        self.assertTrue(snapshot.active.all())
+
+    def test_deleted_vacancy_is_marked_changed(self, redis_mock):
+        with patch('vacancies.signals.mark_vacancy_changed') as mark_mock, \
+                patch('vacancies.signals.feed_cache') as cache_mock:
+            with self.captureOnCommitCallbacks(execute=True):
+                vacancy_id = self.designer.id
+                self.designer.delete()
+
+        mark_mock.assert_called_once_with(vacancy_id)
+        cache_mock.bump_global.assert_called_once()
+
+    def test_rank_vacancies_applies_queryset_filters(self, redis_mock):
+        redis_mock.get.return_value = None
+        vacancy_index.build()
+
+        page = rank_vacancies(Vacancy.objects.exclude(id=self.python_dev.id), self.user, None, 2)
+        self.assertEqual([vacancy.id for vacancy in page], [self.backend.id, self.designer.id])
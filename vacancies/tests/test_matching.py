@@ -0,0 +1,84 @@
+from django.test import TestCase
+
+from common.models import Specialization, Skill
+from users.models import User
+from vacancies.matching import update_vacancy_scores, update_user_scores, check_match_scores, \
+    annotate_stored_match_score, rebuild_match_scores
+from vacancies.models import Vacancy, VacancyMatchScore, VacancyResponse
+
+
+class MatchScoreStoreTest(TestCase):
+    def setUp(self):
+        self.specialization = Specialization.objects.create(name='Backend Development')
+        self.python = Skill.objects.create(name='Python')
+        self.django = Skill.objects.create(name='Django')
+
+        self.user = User.objects.create(first_name='John', username='johndoe', specialization=self.specialization)
+        self.user.skills.add(self.python)
+        self.other_user = User.objects.create(first_name='Jane', username='janedoe')
+
+        self.vacancy = Vacancy.objects.create(
+            title='Backend Developer',
+            creator=self.other_user,
+            approval_status='accepted',
+            experience='intern'
+        )
+        self.vacancy.specializations.add(self.specialization)
+        self.vacancy.skills.add(self.python, self.django)
+
+    def test_update_vacancy_scores(self):
+        update_vacancy_scores(self.vacancy.id)
+
+        score = VacancyMatchScore.objects.get(user=self.user, vacancy=self.vacancy)
+        self.assertEqual(score.score, 70)
+        self.assertFalse(VacancyMatchScore.objects.filter(user=self.other_user).exists())
+
+    def test_rejected_vacancy_scores_are_removed(self):
+        update_vacancy_scores(self.vacancy.id)
+        Vacancy.objects.filter(id=self.vacancy.id).update(approval_status='blocked')
+
+        update_vacancy_scores(self.vacancy.id)
+        self.assertFalse(VacancyMatchScore.objects.filter(vacancy=self.vacancy).exists())
+
+    def test_overlapping_updates_upsert_and_drop_stale_pairs(self):
+        update_user_scores(self.user.id)
+        update_vacancy_scores(self.vacancy.id)
+        self.assertEqual(VacancyMatchScore.objects.get(user=self.user).score, 70)
+
+        self.user.skills.clear()
+        User.objects.filter(id=self.user.id).update(specialization=None)
+        update_vacancy_scores(self.vacancy.id)
+        self.assertFalse(VacancyMatchScore.objects.filter(user=self.user).exists())
+
+    def test_check_match_scores(self):
+        update_user_scores(self.user.id)
+        self.assertEqual(check_match_scores([self.user.id]), [])
+
+        self.user.skills.add(self.django)
+        self.assertEqual(check_match_scores([self.user.id]), [(self.user.id, self.vacancy.id, 70, 100)])
+
+    def test_annotate_stored_match_score(self):
+        update_user_scores(self.user.id)
+        other_vacancy = Vacancy.objects.create(title='Designer', creator=self.other_user)
+
+        scores = dict(annotate_stored_match_score(Vacancy.objects.all(), self.user).values_list('id', 'match_score'))
+        self.assertEqual(scores, {self.vacancy.id: 70, other_vacancy.id: 0})
+
+    def test_response_score_is_stored_and_refreshed(self):
+        response = VacancyResponse.objects.create(user=self.user, vacancy=self.vacancy)
+        self.assertEqual(response.match_score, 70)
+
+        self.user.skills.add(self.django)
+        update_user_scores(self.user.id)
+
+        response.refresh_from_db()
+        self.assertEqual(response.match_score, 100)
+
+    def test_rebuild_backfills_response_scores(self):
+        response = VacancyResponse.objects.create(user=self.user, vacancy=self.vacancy)
+        VacancyResponse.objects.filter(id=response.id).update(match_score=0)
+
+        rebuild_match_scores()
+
+        response.refresh_from_db()
+        self.assertEqual(response.match_score, 70)
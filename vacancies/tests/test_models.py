@@ -1,11 +1,14 @@
 from aiohttp.web_fileresponse import content_type
-from django.contrib.contenttypes.models import ContentType
+from unittest.mock import patch
+
+import fakeredis
 from django.test import TestCase
 
 from common.models import Specialization, Skill
 from users.models import User
 from vacancies.models import Vacancy, VacancyResponse
-from views.models import View
+from vacancies.tasks import VIEWS_STREAM_KEY
+from views.counters import view_counter
 
 
 class VacancyModelTest(TestCase):
@@ -38,19 +41,46 @@ class VacancyModelTest(TestCase):
         self.assertEqual(self.vacancy.max_payment, 3000)
         self.assertEqual(self.vacancy.currency, 'USD')
 
-    def test_register_view(self):
-        self.vacancy.register_view(self.user)
-        # нужно сделать мок redis
-        self.assertTrue(True)
-
-    def test_get_views_count(self):
-        content_type = ContentType.objects.get_for_model(Vacancy)
-        View.objects.create(
-            object_id=self.vacancy.id,
-            content_type=content_type,
-            user=self.user
-        )
-        self.assertEqual(self.vacancy.get_views_count(), 1)
+    def test_save_increments_version_in_database(self):
+        stale = Vacancy.objects.get(id=self.vacancy.id)
+        version = stale.version
+        Vacancy.bump_versions([self.vacancy.id])
+
+        stale.title = 'Senior Backend Developer'
+        stale.save()
+
+        self.assertEqual(stale.version, version + 2)
+        self.assertEqual(Vacancy.objects.get(id=self.vacancy.id).version, version + 2)
+
+    @patch('views.counters.redis_client')
+    def test_register_view(self, redis_mock):
+        redis_mock.eval.return_value = [6, 4]
+
+        self.assertEqual(self.vacancy.register_view(self.user), (6, 4))
+        keys = redis_mock.eval.call_args.args[2:8]
+        self.assertEqual(keys[0], f'views:seen:vacancy:{self.vacancy.id}:{self.user.id}')
+        self.assertEqual(keys[1], f'vacancy:{self.vacancy.id}:views')
+
+    def test_repeated_views_are_collapsed(self):
+        redis = fakeredis.FakeStrictRedis()
+        with patch('views.counters.redis_client', redis), self.settings(VIEW_DEDUP_WINDOW=60):
+            self.assertEqual(self.vacancy.register_view(self.user), (1, 1))
+            self.assertEqual(self.vacancy.register_view(self.user), (1, 1))
+            self.assertEqual(view_counter.get_dedup_stats(Vacancy), {'registered': 1, 'collapsed': 1})
+        self.assertEqual(redis.xlen(VIEWS_STREAM_KEY), 1)
+
+    @patch('views.counters.redis_client')
+    def test_get_views_count(self, redis_mock):
+        redis_mock.pipeline.return_value.execute.return_value = [b'3', 2]
+        self.assertEqual(self.vacancy.get_views_count(), 3)
+
+    @patch('views.counters.redis_client')
+    def test_get_views_count_falls_back_to_column(self, redis_mock):
+        Vacancy.objects.filter(id=self.vacancy.id).update(views_count=7)
+        self.vacancy.refresh_from_db()
+
+        redis_mock.pipeline.return_value.execute.return_value = [None, 0]
+        self.assertEqual(self.vacancy.get_views_count(), 7)
 
 
 class VacancyResponseModelTest(TestCase):
@@ -87,3 +117,16 @@ class VacancyResponseModelTest(TestCase):
     def test_vacancy_response_unique_constraint(self):
         with self.assertRaises(Exception):
             VacancyResponse.objects.create(user=self.user, vacancy=self.vacancy)
+
+    def test_status_changes_are_tracked_without_queries(self):
+        response = VacancyResponse.objects.get(id=self.vacancy_response.id)
+        response.status = 'approved'
+        self.assertEqual(response.get_changes(), {'status': ('pending', 'approved')})
+
+        response.save()
+        self.assertEqual(response.saved_changes, {'status': ('pending', 'approved')})
+        self.assertEqual(response.get_changes(), {})
+
+        with self.assertNumQueries(0):
+            response.is_viewed = True
+            self.assertEqual(response.get_changes(), {})
@@ -0,0 +1,51 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.http import QueryDict
+from django.test import TestCase
+
+from users.models import User
+from vacancies.models import Vacancy, ExchangeRate
+from vacancies.salary import recompute_salaries, filter_by_salary
+
+
+@patch('vacancies.salary.redis_client')
+class NormalizedSalaryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        ExchangeRate.objects.create(currency='RUB', usd_rate=Decimal('0.01'))
+
+    def create_vacancy(self, **kwargs):
+        return Vacancy.objects.create(title='Backend Developer', creator=self.user, **kwargs)
+
+    def test_salary_is_normalized_on_save(self, redis_mock):
+        redis_mock.get.return_value = None
+        monthly = self.create_vacancy(min_payment=100000, max_payment=200000, currency='RUB',
+                                      payment_format='monthly')
+        hourly = self.create_vacancy(min_payment=10, max_payment=20, currency='USD', payment_format='hourly')
+        fixed = self.create_vacancy(min_payment=500, currency='USD', payment_format='fixed')
+
+        self.assertEqual((monthly.salary_min_usd_monthly, monthly.salary_max_usd_monthly), (1000, 2000))
+        self.assertEqual((hourly.salary_min_usd_monthly, hourly.salary_max_usd_monthly), (1600, 3200))
+        self.assertEqual((fixed.salary_min_usd_monthly, fixed.salary_max_usd_monthly), (None, None))
+
+    def test_recompute_after_rate_change(self, redis_mock):
+        redis_mock.get.return_value = None
+        vacancy = self.create_vacancy(min_payment=120000, max_payment=240000, currency='RUB',
+                                      payment_format='yearly')
+        ExchangeRate.objects.filter(currency='RUB').update(usd_rate=Decimal('0.02'))
+
+        recompute_salaries('RUB')
+        vacancy.refresh_from_db()
+        self.assertEqual((vacancy.salary_min_usd_monthly, vacancy.salary_max_usd_monthly), (200, 400))
+
+    def test_filter_by_salary(self, redis_mock):
+        redis_mock.get.return_value = None
+        low = self.create_vacancy(min_payment=500, max_payment=1000, currency='USD', payment_format='monthly')
+        high = self.create_vacancy(min_payment=3000, max_payment=5000, currency='USD', payment_format='monthly')
+
+        queryset = filter_by_salary(Vacancy.objects.all(), QueryDict('salary_from=2000'))
+        self.assertEqual(list(queryset), [high])
+
+        queryset = filter_by_salary(Vacancy.objects.all(), QueryDict('salary_to=800'))
+        self.assertEqual(list(queryset), [low])
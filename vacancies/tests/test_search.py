@@ -0,0 +1,36 @@
+from django.test import TestCase
+
+from users.models import User
+from vacancies.models import Vacancy
+from vacancies.search import search_vacancies
+
+
+class VacancySearchTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        self.backend = Vacancy.objects.create(
+            title='Python Backend Developer', creator=self.user, description='Django, PostgreSQL'
+        )
+        self.frontend = Vacancy.objects.create(
+            title='Frontend Developer', creator=self.user, description='React и немного Python'
+        )
+        self.designer = Vacancy.objects.create(
+            title='Дизайнер интерфейсов', creator=self.user, company_name='Студия'
+        )
+
+    def test_search_vector_is_maintained_on_save(self):
+        self.backend.refresh_from_db()
+        self.assertIsNotNone(self.backend.search_vector)
+
+    def test_title_match_ranks_higher(self):
+        results = list(search_vacancies(Vacancy.objects.all(), 'python', self.user).order_by('-search_rank'))
+        self.assertEqual([v.id for v in results], [self.backend.id, self.frontend.id])
+
+    def test_only_top_text_matches_are_reranked(self):
+        with self.settings(SEARCH_CANDIDATES_LIMIT=1):
+            results = search_vacancies(Vacancy.objects.all(), 'python', self.user)
+            self.assertEqual([v.id for v in results], [self.backend.id])
+
+    def test_russian_morphology(self):
+        results = search_vacancies(Vacancy.objects.all(), 'дизайнеры', self.user)
+        self.assertEqual([v.id for v in results], [self.designer.id])
@@ -1,7 +1,8 @@
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 from users.models import User
 from vacancies.models import Vacancy, VacancyResponse
-from common.models import Specialization, Skill
+from common.models import Specialization, Skill, Language, LanguageProficiency
 from vacancies.serializers import (
     VacancyMainSerializer,
     VacancyListSerializer,
@@ -64,6 +65,43 @@ class VacancySerializerTest(TestCase):
         self.assertTrue('match_score' in data)
 
 
+class VacancySerializerQueryBudgetTest(TestCase):
+    """
+    Количество запросов на страницу не должно зависеть от размера страницы.
+    """
+    QUERY_BUDGET = 4  # вакансии + languages (с language) + skills + specializations
+
+    def setUp(self):
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        self.specialization = Specialization.objects.create(name='Backend Development')
+        self.skill = Skill.objects.create(name='Python')
+        self.language = Language.objects.create(code='en', name='English')
+        content_type = ContentType.objects.get_for_model(Vacancy)
+
+        for i in range(10):
+            vacancy = Vacancy.objects.create(title=f'Vacancy {i}', creator=self.user)
+            vacancy.specializations.add(self.specialization)
+            vacancy.skills.add(self.skill)
+            LanguageProficiency.objects.create(
+                content_type=content_type, object_id=vacancy.id, language=self.language, level='fluent'
+            )
+
+    def assert_query_budget(self, serializer_class, page_size):
+        queryset = serializer_class.setup_eager_loading(Vacancy.objects.order_by('id')[:page_size])
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            data = serializer_class(queryset, many=True).data
+        self.assertEqual(len(data), page_size)
+        self.assertEqual(data[0]['languages'][0]['language'], 'English')
+
+    def test_feed_serializer_query_budget(self):
+        for page_size in (1, 10):
+            self.assert_query_budget(VacancyFeedSerializer, page_size)
+
+    def test_vacancy_serializer_query_budget(self):
+        for page_size in (1, 10):
+            self.assert_query_budget(VacancySerializer, page_size)
+
+
 class VacancyResponseSerializerTest(TestCase):
     def setUp(self):
         self.user = User.objects.create(first_name='John', username='johndoe')
@@ -0,0 +1,84 @@
+import json
+from unittest.mock import patch
+
+import fakeredis
+from django.test import TestCase, override_settings
+
+from users.models import User
+from vacancies.models import Vacancy
+from vacancies.tasks import flush_pending_views, flush_view_counters, consume_view_stream, \
+    VIEWS_STREAM_KEY, VIEWS_STREAM_GROUP
+from views.models import View
+
+
+@patch('vacancies.tasks.redis_client')
+class FlushViewsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        self.vacancy = Vacancy.objects.create(title='Backend Developer', creator=self.user)
+        self.other_vacancy = Vacancy.objects.create(title='Designer', creator=self.user)
+
+    def make_view(self):
+        return json.dumps({
+            'user_id': self.user.id,
+            'vacancy_id': self.vacancy.id,
+            'timestamp': '2024-01-01T00:00:00+00:00'
+        }).encode()
+
+    def test_pending_views_are_drained_in_batches(self, redis_mock):
+        pipe = redis_mock.pipeline.return_value
+        pipe.execute.side_effect = [
+            [[self.make_view(), self.make_view()], True],
+            [[self.make_view()], True],
+        ]
+
+        self.assertEqual(flush_pending_views(batch_size=2), 3)
+        self.assertEqual(View.objects.filter(object_id=self.vacancy.id).count(), 3)
+        pipe.lrange.assert_called_with('pending_vacancy_views', 0, 1)
+        pipe.ltrim.assert_called_with('pending_vacancy_views', 2, -1)
+
+    def test_counters_are_written_in_one_update(self, redis_mock):
+        keys = [f'vacancy:{self.vacancy.id}:views'.encode(), f'vacancy:{self.other_vacancy.id}:views'.encode()]
+        redis_mock.scan_iter.return_value = iter(keys)
+        redis_mock.mget.return_value = [b'5', b'2']
+
+        with self.assertNumQueries(1):
+            self.assertEqual(flush_view_counters(), 2)
+
+        self.vacancy.refresh_from_db()
+        self.other_vacancy.refresh_from_db()
+        self.assertEqual((self.vacancy.views_count, self.other_vacancy.views_count), (5, 2))
+
+
+@override_settings(VIEWS_STREAM_CLAIM_IDLE=0)
+class ViewStreamTest(TestCase):
+    def setUp(self):
+        self.redis = fakeredis.FakeStrictRedis()
+        patcher = patch('vacancies.tasks.redis_client', self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        self.vacancy = Vacancy.objects.create(title='Backend Developer', creator=self.user)
+
+    def add_views(self, count):
+        data = self.vacancy.make_view_data(self.user)
+        for _ in range(count):
+            self.redis.xadd(VIEWS_STREAM_KEY, {'data': data})
+
+    def test_consumers_share_stream(self):
+        self.add_views(5)
+
+        self.assertEqual(consume_view_stream('first', batch_size=3), 5)
+        self.assertEqual(consume_view_stream('second', batch_size=3), 0)
+        self.assertEqual(View.objects.filter(object_id=self.vacancy.id).count(), 5)
+        self.assertEqual(self.redis.xlen(VIEWS_STREAM_KEY), 0)
+
+    def test_entries_of_dead_consumer_are_claimed(self):
+        self.add_views(2)
+        self.redis.xgroup_create(VIEWS_STREAM_KEY, VIEWS_STREAM_GROUP, id='0')
+        # Потребитель прочитал записи и упал до XACK
+        self.redis.xreadgroup(VIEWS_STREAM_GROUP, 'dead', {VIEWS_STREAM_KEY: '>'})
+
+        self.assertEqual(consume_view_stream('alive'), 2)
+        self.assertEqual(self.redis.xpending(VIEWS_STREAM_KEY, VIEWS_STREAM_GROUP)['pending'], 0)
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
@@ -5,6 +7,7 @@ from django.contrib.auth import get_user_model
 
 from common.models import Specialization, Skill
 from vacancies.models import Vacancy, VacancyResponse
+from vacancies.views import VacancyResponseViewSet, VacancyAdminViewSet
 
 User = get_user_model()
 
@@ -37,6 +40,27 @@ class VacancyViewSetTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['title'], self.vacancy.title)
 
+    @patch('vacancies.cache.redis_client')
+    @patch('views.counters.redis_client')
+    def test_retrieve_not_modified(self, counters_mock, cache_mock):
+        counters_mock.eval.return_value = [3, 2]
+        cache_mock.get.return_value = None
+        self.client.force_authenticate(user=self.user)
+        url = reverse('vacancies-detail', kwargs={"pk": self.vacancy.pk})
+
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(response.data['views_count'], 3)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Views-Count'], '3')
+
+        self.vacancy.skills.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
     def test_vacancy_feed(self):
         self.client.force_authenticate(user=self.user)
         url = reverse('vacancies-feed')
@@ -81,6 +105,37 @@ class VacancyResponseViewSetTests(APITestCase):
         response = self.client.patch(url, data)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+    @patch.object(VacancyResponseViewSet, 'notification_func')
+    def test_creator_status_update_notifies(self, notification_mock):
+        self.client.force_authenticate(user=self.creator)
+        url = reverse('vacancy-responses-detail', kwargs={'pk': self.response.id})
+
+        response = self.client.patch(url, {'status': 'approved', 'custom_message': 'Welcome'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        notification_mock.assert_called_once()
+        self.assertEqual(notification_mock.call_args.args[1], 'Welcome')
+
+        self.client.patch(url, {'status': 'approved'})
+        notification_mock.assert_called_once()
+
+    @patch('vacancies.views.send_status_notification')
+    def test_bulk_status(self, notification_mock):
+        other = User.objects.create_user(first_name='Jane', username='janedoe')
+        other_response = VacancyResponse.objects.create(user=other, vacancy=self.vacancy)
+        foreign_vacancy = Vacancy.objects.create(title='Foreign', creator=self.user)
+        foreign_response = VacancyResponse.objects.create(user=other, vacancy=foreign_vacancy)
+
+        self.client.force_authenticate(user=self.creator)
+        url = reverse('vacancy-responses-bulk-status')
+        data = {'ids': [self.response.id, other_response.id, foreign_response.id], 'status': 'approved'}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(response.data['updated']), sorted([self.response.id, other_response.id]))
+        self.assertEqual(VacancyResponse.objects.filter(status='approved').count(), 2)
+        self.assertEqual(notification_mock.call_count, 2)
+
 
 class VacancyAdminViewSetTests(APITestCase):
     def setUp(self):
@@ -98,10 +153,12 @@ class VacancyAdminViewSetTests(APITestCase):
             approval_status='pending'
         )
 
-    def test_admin_can_update_approval_status(self):
+    @patch.object(VacancyAdminViewSet, 'notification_func')
+    def test_admin_can_update_approval_status(self, notification_mock):
         data = {'approval_status': 'accepted'}
         url = reverse('vacancy-admin-detail', kwargs={'pk': self.vacancy.id})
         response = self.client.patch(url, data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.vacancy.refresh_from_db()
         self.assertEqual(self.vacancy.approval_status, 'accepted')
+        notification_mock.assert_called_once()
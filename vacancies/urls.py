@@ -1,5 +1,7 @@
+from django.urls import path
 from rest_framework import routers
 
+from vacancies.async_views import vacancy_feed, vacancy_detail
 from vacancies.views import VacancyViewSet, VacancyResponseViewSet, VacancyAdminViewSet
 
 app_name = 'vacancies'
@@ -12,3 +14,9 @@ vacancy_response_router.register(r'', VacancyResponseViewSet, basename='vacancy-
 
 vacancy_admin_router = routers.DefaultRouter()
 vacancy_admin_router.register(r'', VacancyAdminViewSet, basename='vacancy-admin')
+
+# Async-обработчики для ASGI-деплоя
+vacancy_async_urlpatterns = [
+    path('feed/', vacancy_feed, name='vacancies-async-feed'),
+    path('<int:pk>/', vacancy_detail, name='vacancies-async-detail'),
+]
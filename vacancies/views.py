@@ -1,66 +1,142 @@
+from functools import partial
+
+from django.db import transaction
 from django.db.models import Q
+from django.utils.http import parse_etags
 from rest_framework import mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from common.services import perform_update_and_notify
+from common.mixins import EagerLoadingMixin
+from common.pagination import KeysetPagination
+from common.tracking import TrackedUpdateMixin
+from vacancies.analytics import get_vacancy_analytics, get_response_summary, mark_responses_changed
+from vacancies.cache import feed_cache, facets_cache, vacancy_detail_cache, get_detail_headers
+from vacancies.facets import get_facet_counts, get_facet_params
+from vacancies.feed import get_feed_page
+from vacancies.salary import filter_by_salary
+from vacancies.search import search_vacancies, SearchPagination
 from vacancies.models import Vacancy, VacancyResponse
 from vacancies.serializers import (VacancyFeedSerializer, VacancyMainSerializer,
                                    VacancyResponseSerializer, VacancyResponseStatusUpdateSerializer,
-                                   VacancyApprovalSerializer, VacancyResponseShortSerializer)
+                                   VacancyApprovalSerializer, VacancyResponseShortSerializer,
+                                   VacancyResponseBulkStatusSerializer)
 
 from vacancies.services import send_status_notification, send_verification_notification, \
-    get_vacancy_feed_queryset, get_onboarding_vacancies, annotate_response_match_score
+    get_vacancy_feed_queryset, get_onboarding_vacancies
 
 
-class VacancyViewSet(mixins.CreateModelMixin,
+class VacancyViewSet(EagerLoadingMixin,
+                     mixins.CreateModelMixin,
                      mixins.RetrieveModelMixin,
                      mixins.UpdateModelMixin,
                      mixins.DestroyModelMixin,
                      GenericViewSet):
     serializer_class = VacancyMainSerializer
     queryset = Vacancy.objects.all()
+    pagination_class = KeysetPagination
+
+    def get_serializer_class(self):
+        if self.action in ['feed', 'onboarding', 'search']:
+            return VacancyFeedSerializer
+        return super().get_serializer_class()
 
     def retrieve(self, request, pk=None, *args, **kwargs):
+        """
+        Детали вакансии из кэша по version со строгим ETag (при совпадении If-None-Match — 304).
+        Счетчики просмотров в кэш не входят: они добавляются в тело и в заголовки X-Views-Count.
+        """
+        state = Vacancy.objects.filter(pk=pk).values('id', 'version', 'views_count').first()
+        if state is None:
+            raise NotFound
+        vacancy = Vacancy(**state)
+
+        views_count, unique_views_count = vacancy.register_view(request.user)
+        headers = get_detail_headers(vacancy, views_count, unique_views_count)
+        if vacancy.get_etag() in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response_data = vacancy_detail_cache.get_or_set(
+            vacancy.id, vacancy.version, lambda: self.get_detail_data(vacancy.id)
+        )
+        response_data['views_count'] = views_count
+        response_data['unique_views_count'] = unique_views_count
+
+        return Response(response_data, headers=headers)
+
+    def get_detail_data(self, pk):
         instance = Vacancy.objects.select_related('creator') \
             .prefetch_related('skills', 'specializations', 'languages') \
             .get(id=pk)
+        return self.get_serializer(instance).data
 
-        instance.register_view(request.user)
-        views_count = instance.get_views_count()
+    @action(detail=False, methods=['get'], url_path='feed')
+    def feed(self, request, *args, **kwargs):
+        compute = partial(get_feed_page, self.get_queryset(), request, self.get_serializer_context())
+        data = feed_cache.get_or_set(request.user.pk, request.query_params, compute, request.path)
+        return Response(data)
 
-        serializer = self.get_serializer(instance)
-        response_data = serializer.data
-        response_data['views_count'] = views_count
+    @action(detail=False, methods=['get'], url_path='feed/facets')
+    def feed_facets(self, request, *args, **kwargs):
+        """
+        Счетчики значений фильтров ленты для текущего набора фильтров.
+        """
+        params = get_facet_params(request.query_params)
+        data = facets_cache.get_or_set(request.user.pk, params, lambda: self.get_feed_facets(request, params))
+        return Response(data)
 
-        return Response(response_data)
+    def get_feed_facets(self, request, params):
+        qs = get_vacancy_feed_queryset(Vacancy.objects.all(), params, request.user)
+        return get_facet_counts(filter_by_salary(qs, params))
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request, *args, **kwargs):
+        """
+        Полнотекстовый поиск по title/company_name/description с фильтрами ленты.
+        Результаты упорядочены по ts_rank с учетом match_score, пагинация курсором.
+        """
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response({'q': 'Обязательный параметр.'}, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['get'], url_path='feed')
-    def feed(self, request, *args, **kwargs):
         qs = get_vacancy_feed_queryset(self.get_queryset(), request.query_params, request.user)
-        page = self.paginate_queryset(qs)
-        serializer = VacancyFeedSerializer(page if page is not None else qs, many=True, context={"request": request})
-        return self.get_paginated_response(serializer.data) if page else Response(serializer.data)
+        qs = search_vacancies(qs, text, request.user)
+
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=False, methods=['get'], url_path='onboarding')
     def onboarding(self, request, *args, **kwargs):
         data = get_onboarding_vacancies(self.get_queryset(), request, VacancyFeedSerializer)
         return Response(data)
 
+    @action(detail=True, methods=['GET'], url_path='analytics')
+    def analytics(self, request, pk=None):
+        """
+        Статистика вакансии для создателя: просмотры и отклики по дням, конверсия и воронка статусов.
+        Читает только агрегаты (ViewDailyRollup, VacancyResponseDailyRollup).
+        """
+        vacancy = self.get_object()
+        if request.user.id != vacancy.creator_id:
+            return Response(
+                {'detail': 'Статистику может просматривать только создатель вакансии.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        days = request.query_params.get('days', '')
+        days = min(int(days), 365) if days.isdigit() and int(days) > 0 else 30
+        return Response(get_vacancy_analytics(vacancy, days))
+
     @action(detail=True, methods=['GET'], url_path='responses')
     def responses(self, request, pk=None):
         vacancy = self.get_object()
-
-        if vacancy.type == 'freelance' and vacancy.parent_vacancy is None:
-            all_vacancy_ids = list(vacancy.child_vacancies.values_list('id', flat=True)) + [vacancy.id]
-            child_vacancies = vacancy.child_vacancies.values('id',
-                                                             'specializations__name')
-            responses_qs = VacancyResponse.objects.filter(vacancy_id__in=all_vacancy_ids)
-        else:
-            child_vacancies = []
-            responses_qs = vacancy.responses.all()
+        summary = get_response_summary(vacancy)
+        responses_qs = VacancyResponse.objects.filter(vacancy_id__in=summary['vacancy_ids'])
 
         child_vacancy_id = request.query_params.get('child_vacancy_id')
         if child_vacancy_id:
@@ -76,75 +152,86 @@ class VacancyViewSet(mixins.CreateModelMixin,
         elif filter_param == 'viewed':
             responses_qs = responses_qs.filter(is_viewed=True)
 
-        responses_qs = annotate_response_match_score(responses_qs, vacancy)
-
-        serializer = VacancyResponseShortSerializer(responses_qs.distinct(), many=True)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(responses_qs.select_related('user'), request, view=self)
+        serializer = VacancyResponseShortSerializer(page, many=True)
 
         vacancy_data = {
             'id': vacancy.id,
-            'name': vacancy.name,
+            'name': vacancy.title,
             'company_name': vacancy.company_name,
             'approval_status': vacancy.approval_status,
             'response_count': vacancy.response_count,
             'views_count': vacancy.views_count,
-            'child_vacancies': {cv['specializations__name']: cv['id'] for cv in child_vacancies}
+            'child_vacancies': {child['specialization']: child['id'] for child in summary['children']},
+            'children': summary['children'],
+            'response_counts': summary['counts'],
         }
 
         return Response(
             {
                 'vacancy': vacancy_data,
-                'responses': serializer.data
+                'responses': serializer.data,
+                'next': paginator.get_next_link()
             },
             status=status.HTTP_200_OK
         )
 
 
-class VacancyResponseViewSet(mixins.CreateModelMixin,
+class VacancyResponseViewSet(TrackedUpdateMixin,
+                             mixins.CreateModelMixin,
                              mixins.RetrieveModelMixin,
                              mixins.UpdateModelMixin,
                              GenericViewSet):
-    queryset = VacancyResponse.objects.all()
+    queryset = VacancyResponse.objects.select_related('vacancy')
     serializer_class = VacancyResponseSerializer
+    tracked_field = 'status'
+    notification_func = staticmethod(send_status_notification)
 
     def get_serializer_class(self):
         if self.action in ['update', 'partial_update']:
             instance = self.get_object()
-            if self.request.user == instance.vacancy.creator:
+            if self.request.user.id == instance.vacancy.creator_id:
                 return VacancyResponseStatusUpdateSerializer
         return super().get_serializer_class()
 
-    def update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        if request.user != instance.vacancy.creator:
-            return Response(
-                {'detail': 'Изменять отклик может только создатель вакансии.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        return perform_update_and_notify(
-            view=self,
-            request=request,
-            update_method=lambda: super(VacancyResponseViewSet, self).update(request, *args, **kwargs),
-            field_name='status',
-            notification_func=send_status_notification
-        )
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request, *args, **kwargs):
+        """
+        Массовая смена статуса откликов на вакансии текущего пользователя одним запросом к БД.
+        Уведомления кандидатам ставятся в outbox в той же транзакции.
+        """
+        serializer = VacancyResponseBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        with transaction.atomic():
+            changed = VacancyResponse.bulk_set_status(data['ids'], data['status'], request.user.id)
+
+            # Уведомления пишутся в outbox той же транзакцией, сообщения одному кандидату объединяет дайджест
+            responses = VacancyResponse.objects.select_related('user', 'vacancy') \
+                .filter(id__in=[response_id for response_id, _, _ in changed])
+            for response in responses:
+                send_status_notification(response, data.get('custom_message'))
+            for vacancy_id in {vacancy_id for _, _, vacancy_id in changed}:
+                transaction.on_commit(partial(mark_responses_changed, vacancy_id))
+
+        return Response({'updated': [response_id for response_id, _, _ in changed]}, status=status.HTTP_200_OK)
 
-    def partial_update(self, request, *args, **kwargs):
-        instance = self.get_object()
-        if request.user != instance.vacancy.creator:
-            return Response(
-                {'detail': 'Изменять отклик может только создатель вакансии.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-        return perform_update_and_notify(
-            view=self,
-            request=request,
-            update_method=lambda: super(VacancyResponseViewSet, self).partial_update(request, *args, **kwargs),
-            field_name='status',
-            notification_func=send_status_notification
-        )
+    def update(self, request, *args, **kwargs):
+        # partial_update тоже проходит через update; get_object блокирует строку, поэтому нужна транзакция
+        with transaction.atomic():
+            instance = self.get_object()
+            if request.user.id != instance.vacancy.creator_id:
+                return Response(
+                    {'detail': 'Изменять отклик может только создатель вакансии.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            return super().update(request, *args, **kwargs)
 
 
-class VacancyAdminViewSet(mixins.RetrieveModelMixin,
+class VacancyAdminViewSet(TrackedUpdateMixin,
+                          mixins.RetrieveModelMixin,
                           mixins.UpdateModelMixin,
                           GenericViewSet):
     """
@@ -156,21 +243,5 @@ class VacancyAdminViewSet(mixins.RetrieveModelMixin,
     queryset = Vacancy.objects.all()
     serializer_class = VacancyApprovalSerializer
     permission_classes = [IsAdminUser]
-
-    def update(self, request, *args, **kwargs):
-        return perform_update_and_notify(
-            view=self,
-            request=request,
-            update_method=lambda: super(VacancyAdminViewSet, self).update(request, *args, **kwargs),
-            field_name='approval_status',
-            notification_func=send_verification_notification
-        )
-
-    def partial_update(self, request, *args, **kwargs):
-        return perform_update_and_notify(
-            view=self,
-            request=request,
-            update_method=lambda: super(VacancyAdminViewSet, self).partial_update(request, *args, **kwargs),
-            field_name='approval_status',
-            notification_func=send_verification_notification
-        )
+    tracked_field = 'approval_status'
+    notification_func = staticmethod(send_verification_notification)
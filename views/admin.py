@@ -1,3 +1,9 @@
 from django.contrib import admin
 
-# Register your models here.
+from views.models import ViewDailyRollup
+
+
+@admin.register(ViewDailyRollup)
+class ViewDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('content_type', 'object_id', 'day', 'views', 'unique_viewers')
+    list_filter = ('content_type',)
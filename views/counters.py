@@ -0,0 +1,117 @@
+from django.conf import settings
+from redis import RedisError
+
+from common.redis import redis_client, async_redis_client
+
+# Ключ общего числа просмотров совпадает с тем, что читает flush_views_to_db
+TOTAL_KEY = '{}:{}:views'
+UNIQUE_KEY = '{}:{}:viewers'
+SEEN_KEY = 'views:seen:{}:{}:{}'
+REGISTERED_KEY = 'views:registered:{}'
+COLLAPSED_KEY = 'views:collapsed:{}'
+
+# Просмотр записывается в поток и увеличивает счетчик, только если пользователь
+# не смотрел объект в течение окна (ARGV[1] секунд, 0 — без дедупликации)
+REGISTER_VIEW_SCRIPT = """
+local window = tonumber(ARGV[1])
+local fresh = window <= 0 or redis.call('set', KEYS[1], 1, 'NX', 'EX', window)
+redis.call('set', KEYS[2], ARGV[2], 'NX')
+local total
+if fresh then
+    total = redis.call('incr', KEYS[2])
+    redis.call('xadd', KEYS[4], '*', 'data', ARGV[4])
+    redis.call('incr', KEYS[5])
+else
+    total = tonumber(redis.call('get', KEYS[2]))
+    redis.call('incr', KEYS[6])
+end
+redis.call('pfadd', KEYS[3], ARGV[3])
+return {total, redis.call('pfcount', KEYS[3])}
+"""
+
+
+class ViewCounter:
+    """
+    Счетчики просмотров объекта (вакансии, события) в Redis:
+    INCR для общего числа просмотров и HyperLogLog (PFADD/PFCOUNT) для уникальных зрителей.
+
+    Счетчик общего числа при первом обращении засевается значением views_count из БД,
+    а периодическая задача переносит его обратно в views_count.
+
+    Повторные просмотры одного пользователя в пределах VIEW_DEDUP_WINDOW схлопываются:
+    они не пишутся в поток и не увеличивают счетчик, но учитываются в метрике collapsed.
+    """
+
+    @staticmethod
+    def get_keys(obj):
+        name = obj._meta.model_name
+        return TOTAL_KEY.format(name, obj.pk), UNIQUE_KEY.format(name, obj.pk)
+
+    def get_register_args(self, obj, user, stream, data):
+        name = obj._meta.model_name
+        total_key, unique_key = self.get_keys(obj)
+        keys = [SEEN_KEY.format(name, obj.pk, user.pk), total_key, unique_key, stream,
+                REGISTERED_KEY.format(name), COLLAPSED_KEY.format(name)]
+        args = [settings.VIEW_DEDUP_WINDOW, getattr(obj, 'views_count', 0), user.pk, data]
+        return REGISTER_VIEW_SCRIPT, len(keys), *keys, *args
+
+    def register(self, obj, user, stream, data):
+        """
+        Регистрирует просмотр (data добавляется в stream) и возвращает (просмотры, уникальные зрители).
+        Без Redis — views_count из БД и None.
+        """
+        try:
+            total, unique = redis_client.eval(*self.get_register_args(obj, user, stream, data))
+        except RedisError:
+            return getattr(obj, 'views_count', 0), None
+        return total, unique
+
+    async def aregister(self, obj, user, stream, data):
+        try:
+            total, unique = await async_redis_client.eval(*self.get_register_args(obj, user, stream, data))
+        except RedisError:
+            return getattr(obj, 'views_count', 0), None
+        return total, unique
+
+    def get_dedup_stats(self, model):
+        """
+        Сколько просмотров записано и сколько схлопнуто окном дедупликации.
+        """
+        name = model._meta.model_name
+        registered, collapsed = redis_client.mget(REGISTERED_KEY.format(name), COLLAPSED_KEY.format(name))
+        return {'registered': int(registered or 0), 'collapsed': int(collapsed or 0)}
+
+    def add_counts(self, pipe, obj):
+        total_key, unique_key = self.get_keys(obj)
+        pipe.get(total_key)
+        pipe.pfcount(unique_key)
+
+    def get_counts(self, obj):
+        """
+        Возвращает (просмотры, уникальные зрители). Без Redis — views_count из БД и None.
+        """
+        pipe = redis_client.pipeline(transaction=False)
+        self.add_counts(pipe, obj)
+        try:
+            total, unique = pipe.execute()
+        except RedisError:
+            return getattr(obj, 'views_count', 0), None
+        return self.parse_counts(obj, total, unique)
+
+    async def aget_counts(self, obj):
+        pipe = async_redis_client.pipeline(transaction=False)
+        self.add_counts(pipe, obj)
+        try:
+            total, unique = await pipe.execute()
+        except RedisError:
+            return getattr(obj, 'views_count', 0), None
+        return self.parse_counts(obj, total, unique)
+
+    @staticmethod
+    def parse_counts(obj, total, unique):
+        if total is None:
+            total = getattr(obj, 'views_count', 0)
+        return int(total), int(unique)
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from views.partitions import is_partitioned, convert_to_partitioned, get_partitions
+
+
+class Command(BaseCommand):
+    help = 'Переводит таблицу просмотров в секционированную по месяцам (однократно, под блокировкой таблицы)'
+
+    def handle(self, *args, **options):
+        if is_partitioned():
+            self.stdout.write('Таблица уже секционирована')
+            return
+
+        convert_to_partitioned()
+        self.stdout.write(self.style.SUCCESS(f'Создано секций: {len(get_partitions())}'))
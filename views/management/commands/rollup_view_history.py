@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from views.rollups import rollup_history
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает дневные агрегаты просмотров за всю историю (или за --start/--end). '
+            'Запускается один раз при развертывании до перевода счетчиков и аналитики на агрегаты')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat)
+        parser.add_argument('--end', type=date.fromisoformat)
+
+    def handle(self, *args, start, end, **options):
+        days, rollups = rollup_history(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Дней: {days}, агрегатов: {rollups}'))
@@ -1,12 +1,38 @@
 from django.db import models
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
 from users.models import User
 
 
 class View(models.Model):
+    """
+    Сырой просмотр. В Postgres таблица секционирована по месяцам по timestamp
+    (views.partitions), старые секции удаляются по VIEWS_RETENTION_MONTHS,
+    поэтому счетчики и аналитика читают ViewDailyRollup.
+    """
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
     content_object = GenericForeignKey('content_type', 'object_id')
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Время просмотра приходит из Redis, поэтому не auto_now_add
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'timestamp'], name='view_object_timestamp_idx'),
+        ]
+
+
+class ViewDailyRollup(models.Model):
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    unique_viewers = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id', 'day'], name='unique_view_daily_rollup')
+        ]
@@ -0,0 +1,148 @@
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from views.models import View
+
+PARTITION_NAME = '{}_y{}m{:02d}'
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def get_partition_name(month):
+    return PARTITION_NAME.format(View._meta.db_table, month.year, month.month)
+
+
+def is_partitioned():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)",
+            [View._meta.db_table]
+        )
+        return cursor.fetchone()[0]
+
+
+def get_partitions():
+    """
+    Возвращает {первое число месяца: имя секции} для месячных секций таблицы просмотров.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [View._meta.db_table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    prefix = f'{View._meta.db_table}_y'
+    partitions = {}
+    for name in names:
+        if name.startswith(prefix):
+            year, month = name[len(prefix):].split('m')
+            partitions[date(int(year), int(month), 1)] = name
+    return partitions
+
+
+def table_exists(name):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        return cursor.fetchone()[0]
+
+
+def create_partition(month):
+    """
+    Создает месячную секцию. Строки этого месяца, уже попавшие в DEFAULT-секцию,
+    переносятся в новую секцию до ATTACH, иначе Postgres не даст ее присоединить.
+    """
+    table = View._meta.db_table
+    name = get_partition_name(month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if table_exists(name):
+            return
+        cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)")
+        if table_exists(f'{table}_default'):
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {table}_default "
+                f"WHERE timestamp >= '{start}' AND timestamp < '{end}' RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            )
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+
+
+def ensure_partitions(today=None):
+    """
+    Создает секции на текущий и VIEWS_PARTITIONS_AHEAD следующих месяцев.
+    """
+    month = (today or date.today()).replace(day=1)
+    for offset in range(settings.VIEWS_PARTITIONS_AHEAD + 1):
+        create_partition(add_months(month, offset))
+
+
+def drop_expired_partitions(today=None):
+    """
+    Отсоединяет секции старше VIEWS_RETENTION_MONTHS и, если VIEWS_RETENTION_DROP, удаляет их.
+    Возвращает имена обработанных секций.
+    """
+    oldest = add_months((today or date.today()).replace(day=1), -settings.VIEWS_RETENTION_MONTHS)
+    table = View._meta.db_table
+    expired = [name for month, name in sorted(get_partitions().items()) if month < oldest]
+
+    for name in expired:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            if settings.VIEWS_RETENTION_DROP:
+                cursor.execute(f"DROP TABLE {name}")
+    return expired
+
+
+def convert_to_partitioned():
+    """
+    Переводит обычную таблицу просмотров в секционированную по месяцам:
+    создает новую таблицу с PK (id, timestamp), индексами, секциями по диапазону данных
+    и DEFAULT-секцией, переносит строки и удаляет старую таблицу. Выполняется в одной транзакции.
+    """
+    table = View._meta.db_table
+    old_table = f'{table}_unpartitioned'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SELECT min(timestamp), max(timestamp), max(id) FROM {table}")
+        first, last, max_id = cursor.fetchone()
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old_table}")
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {old_table} INCLUDING DEFAULTS INCLUDING IDENTITY) "
+            f"PARTITION BY RANGE (timestamp)"
+        )
+        cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, timestamp)")
+        for field in View._meta.concrete_fields:
+            if field.remote_field:
+                remote = field.remote_field.model._meta
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD FOREIGN KEY ({field.column}) "
+                    f"REFERENCES {remote.db_table} ({remote.pk.column}) DEFERRABLE INITIALLY DEFERRED"
+                )
+            # LIKE не копирует индексы старой таблицы, индексы внешних ключей создаются заново
+            if field.db_index and not field.primary_key:
+                cursor.execute(f"CREATE INDEX {table}_{field.column}_idx ON {table} ({field.column})")
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        month = (first.date() if first else date.today()).replace(day=1)
+        while last and month <= last.date():
+            create_partition(month)
+            month = add_months(month, 1)
+        ensure_partitions()
+
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {old_table}")
+        if max_id:
+            cursor.execute("SELECT setval(pg_get_serial_sequence(%s, 'id'), %s)", [table, max_id])
+        cursor.execute(f"DROP TABLE {old_table}")
+
+        with connection.schema_editor() as schema_editor:
+            for index in View._meta.indexes:
+                schema_editor.add_index(View, index)
@@ -0,0 +1,75 @@
+from datetime import datetime, time, timedelta, timezone
+
+from django.db.models import Count, Max, Min, Sum
+
+from views.models import View, ViewDailyRollup
+
+
+def get_day_range(day):
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def rollup_day(day):
+    """
+    Пересчитывает дневные агрегаты просмотров за day одним GROUP BY
+    (по индексу (content_type, object_id, timestamp) внутри одной месячной секции).
+    Возвращает количество записанных агрегатов.
+    """
+    start, end = get_day_range(day)
+    rows = View.objects.filter(timestamp__gte=start, timestamp__lt=end) \
+        .values('content_type_id', 'object_id') \
+        .annotate(views=Count('id'), unique_viewers=Count('user_id', distinct=True)) \
+        .order_by()
+
+    rollups = [
+        ViewDailyRollup(
+            content_type_id=row['content_type_id'],
+            object_id=row['object_id'],
+            day=day,
+            views=row['views'],
+            unique_viewers=row['unique_viewers'],
+        )
+        for row in rows
+    ]
+    ViewDailyRollup.objects.bulk_create(
+        rollups,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['content_type', 'object_id', 'day'],
+        update_fields=['views', 'unique_viewers'],
+    )
+    return len(rollups)
+
+
+def rollup_history(start=None, end=None):
+    """
+    Пересчитывает агрегаты за каждый день с start по end включительно
+    (по умолчанию — весь диапазон сырых просмотров). Нужен при первом развертывании агрегатов:
+    периодическая задача пересчитывает только вчера и сегодня.
+    Возвращает (количество дней, количество записанных агрегатов).
+    """
+    bounds = View.objects.aggregate(first=Min('timestamp'), last=Max('timestamp'))
+    if bounds['first'] is None:
+        return 0, 0
+
+    day = start or bounds['first'].astimezone(timezone.utc).date()
+    end = end or bounds['last'].astimezone(timezone.utc).date()
+    days = rollups = 0
+    while day <= end:
+        rollups += rollup_day(day)
+        days += 1
+        day += timedelta(days=1)
+    return days, rollups
+
+
+def get_total_views(content_type, object_ids):
+    """
+    Суммарные просмотры объектов по агрегатам: {object_id: views}.
+    """
+    return dict(
+        ViewDailyRollup.objects.filter(content_type=content_type, object_id__in=object_ids)
+        .values('object_id')
+        .annotate(total=Sum('views'))
+        .values_list('object_id', 'total')
+    )
@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+
+from core.celery import celery_app as app
+
+
+@app.task
+def rollup_view_stats():
+    """
+    Пересчитываем дневные агрегаты просмотров за вчера и сегодня.
+    Более ранние дни заполняются один раз командой rollup_view_history
+    """
+    from views.rollups import rollup_day
+
+    today = date.today()
+    rollup_day(today - timedelta(days=1))
+    rollup_day(today)
+
+
+@app.task
+def manage_view_partitions():
+    """Создаем секции просмотров на следующие месяцы и удаляем устаревшие"""
+    from views.partitions import is_partitioned, ensure_partitions, drop_expired_partitions
+
+    if not is_partitioned():
+        return
+    ensure_partitions()
+    drop_expired_partitions()
@@ -1,3 +1,54 @@
+from datetime import date, datetime, timezone
+
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
 
-# Create your tests here.
+from users.models import User
+from views.models import View, ViewDailyRollup
+from views.partitions import add_months, get_partition_name
+from views.rollups import rollup_day, rollup_history, get_total_views
+
+
+class ViewRollupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(first_name='John', username='johndoe')
+        self.other_user = User.objects.create(first_name='Jane', username='janedoe')
+        self.content_type = ContentType.objects.get_for_model(User)
+
+    def add_view(self, user, timestamp):
+        View.objects.create(user=user, content_type=self.content_type, object_id=1, timestamp=timestamp)
+
+    def test_rollup_day(self):
+        self.add_view(self.user, datetime(2024, 5, 1, 10, tzinfo=timezone.utc))
+        self.add_view(self.user, datetime(2024, 5, 1, 11, tzinfo=timezone.utc))
+        self.add_view(self.other_user, datetime(2024, 5, 1, 23, 59, tzinfo=timezone.utc))
+        self.add_view(self.user, datetime(2024, 5, 2, 0, 1, tzinfo=timezone.utc))
+
+        self.assertEqual(rollup_day(date(2024, 5, 1)), 1)
+        rollup = ViewDailyRollup.objects.get(object_id=1, day=date(2024, 5, 1))
+        self.assertEqual((rollup.views, rollup.unique_viewers), (3, 2))
+
+    def test_rollup_is_idempotent(self):
+        self.add_view(self.user, datetime(2024, 5, 1, 10, tzinfo=timezone.utc))
+        rollup_day(date(2024, 5, 1))
+        self.add_view(self.other_user, datetime(2024, 5, 1, 12, tzinfo=timezone.utc))
+        rollup_day(date(2024, 5, 1))
+
+        self.assertEqual(ViewDailyRollup.objects.count(), 1)
+        self.assertEqual(get_total_views(self.content_type, [1]), {1: 2})
+
+    def test_rollup_history(self):
+        self.add_view(self.user, datetime(2024, 4, 29, 10, tzinfo=timezone.utc))
+        self.add_view(self.other_user, datetime(2024, 5, 1, 10, tzinfo=timezone.utc))
+
+        self.assertEqual(rollup_history(), (3, 2))
+        self.assertEqual(get_total_views(self.content_type, [1]), {1: 2})
+
+
+class ViewPartitionTest(TestCase):
+    def test_add_months(self):
+        self.assertEqual(add_months(date(2024, 11, 15), 2), date(2025, 1, 1))
+        self.assertEqual(add_months(date(2024, 1, 1), -13), date(2022, 12, 1))
+
+    def test_partition_name(self):
+        self.assertEqual(get_partition_name(date(2024, 3, 1)), 'views_view_y2024m03')